@@ -6,6 +6,30 @@ INFLUXDB_ORG = "my_org"
 INFLUXDB_BUCKET = ""
 INFLUXDB_DATABASE = "realtime_network_metrics"
 
+# Host identity (Kafka message key and InfluxDB tag). Empty means use the machine's hostname
+HOST_ID = ""
+
+# Process name normalization (watcher). Rules are tried in order; the first regex that
+# fully matches the raw nettop name gives the canonical name (backreferences allowed).
+# Canonical names of the main apps match the names already stored in InfluxDB.
+PROCESS_NAME_RULES = [
+    (r"Google Chrome.*", "Google Chrome H"),
+    (r"Slack.*", "Slack"),
+    (r"zoom.*|ZoomPhone.*|CptHost", "zoom.us"),
+    (r"Music|com\.apple\.Music.*", "Music"),
+    (r"Safari.*|com\.apple\.WebKit.*", "Safari"),
+    (r"firefox.*|plugin-container", "Firefox"),
+    (r"Code Helper.*|Code", "Code"),
+    # Generic: drop helper/updater suffixes and version numbers, e.g. 'Foo Helper (GPU)' or 'foo-2.3.1'
+    (r"(.+?)(\s+(Helper|Updater|Update|Agent)\b.*|[\s._-]+v?\d+(\.\d+)+)", r"\1"),
+]
+PROCESS_NAME_CACHE_SIZE = 4096      # Resolved raw names kept in the LRU cache
+LONG_TAIL_MAX_PROCESSES = 10        # Unlisted processes with their own series at any time, per watcher
+LONG_TAIL_MIN_BYTES = 10 * 1024     # Unlisted processes need this much (in + out) in one interval to be admitted
+LONG_TAIL_HALF_LIFE_INTERVALS = 60  # Intervals for the traffic score of an admitted process to halve when quiet
+LONG_TAIL_STATE_FILE = ".long_tail_processes.json"  # Admitted processes survive watcher restarts; "" disables
+OTHER_PROCESS_NAME = "other"
+
 # Application-specific parameters
 COLLECTION_INTERVAL_SECONDS = 60
 QUEUE_MAX_SIZE = 20
@@ -22,4 +46,16 @@ LOG_LEVEL = "INFO"
 # Kafka Configuration
 KAFKA_BOOTSTRAP_SERVERS = "localhost:9092"
 KAFKA_TOPIC_NETWORK_DATA = "network-metrics"
-KAFKA_CONSUMER_GROUP = "network-collector"
\ No newline at end of file
+KAFKA_CONSUMER_GROUP = "network-collector"
+
+# Tiered retention: raw network_traffic older than this is rolled into hourly and daily tiers
+COMPACTION_RAW_AGE_DAYS = 30
+RAW_RETENTION_DAYS = 60     # Must match the --retention-period of INFLUXDB_DATABASE
+ROLLUP_INFLUXDB_DATABASE = "realtime_network_metrics_rollups"  # Rollup tiers, no retention period
+
+# Model registry and scoring service
+MODEL_REGISTRY_DIR = "models"
+SCORING_HOST = "127.0.0.1"
+SCORING_PORT = 8765
+SCORING_MAX_BATCH = 256     # Max daily matrices per batched forward pass
+SCORING_MAX_WAIT_MS = 2     # How long the first request waits for others to join its batch
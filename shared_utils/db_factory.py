@@ -6,7 +6,7 @@ from config import config as default_config
 
 load_dotenv()
 
-def create_influxdb_service():
+def create_influxdb_service(database: str = None):
     # InfluxDB Configuration
     # os.getenv() retrieves an environment variable.
     # The second argument is the fallback value if the environment variable is not set.
@@ -19,10 +19,15 @@ def create_influxdb_service():
     INFLUXDB_PARAMS = { # Using all caps to indicate it's treated as a constant
         "url": INFLUXDB_URL,
         "token": INFLUXDB3_AUTH_TOKEN,
-        "database": INFLUXDB_DATABASE
+        "database": database or INFLUXDB_DATABASE
     }
     db = InfluxDBService(INFLUXDB_PARAMS)
     return db
 
+def create_rollup_influxdb_service():
+    """Service for the database with the compacted rollup tiers (kept longer than raw data)"""
+    ROLLUP_INFLUXDB_DATABASE = os.getenv("ROLLUP_INFLUXDB_DATABASE", default_config.ROLLUP_INFLUXDB_DATABASE)
+    return create_influxdb_service(ROLLUP_INFLUXDB_DATABASE)
+
 if __name__=="__main__":
     create_influxdb_service()
\ No newline at end of file
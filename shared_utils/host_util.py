@@ -0,0 +1,14 @@
+import os
+import socket
+from dotenv import load_dotenv
+
+from config import config as default_config
+
+load_dotenv()
+
+def get_host_id():
+    """
+    Host identity used as the Kafka message key and the InfluxDB `host` tag.
+    HOST_ID env var wins, then config.py, then the machine's hostname.
+    """
+    return os.getenv("HOST_ID", default_config.HOST_ID) or socket.gethostname()
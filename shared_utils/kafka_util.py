@@ -1,25 +1,28 @@
-from kafka import KafkaProducer, KafkaConsumer
+from kafka import KafkaProducer, KafkaConsumer, TopicPartition
 from kafka.admin import KafkaAdminClient, NewTopic
 import json
 import logging
 
 class KafkaNetworkProducer:
-    def __init__(self, bootstrap_servers, topic):
+    def __init__(self, bootstrap_servers, topic, **producer_config):
         self.topic = topic
         self.producer = KafkaProducer(
             bootstrap_servers=bootstrap_servers,
+            key_serializer=lambda k: k.encode('utf-8') if k is not None else None,
             value_serializer=lambda v: json.dumps(v).encode('utf-8'),
+            **producer_config  # e.g. linger_ms/batch_size for bulk producers
         )
     
-    def send_network_data(self, timestamp, app_usage_data):
-        """Send network data to Kafka"""
+    def send_network_data(self, timestamp, app_usage_data, host=None):
+        """Send network data to Kafka, keyed by host so each host stays on one partition in order"""
         message = {
             'timestamp': timestamp.isoformat(),
+            'host': host,
             'app_usage': app_usage_data
         }
         
         try:
-            future = self.producer.send(self.topic, value=message)
+            future = self.producer.send(self.topic, key=host, value=message)
             # Optional: wait for confirmation
             # future.get(timeout=10)
             return True
@@ -27,6 +30,9 @@ class KafkaNetworkProducer:
             logging.error(f"Failed to send to Kafka: {e}")
             return False
     
+    def flush(self):
+        self.producer.flush()
+
     def close(self):
         self.producer.close()
 
@@ -48,12 +54,13 @@ class KafkaNetworkConsumer:
                 data = message.value
                 timestamp_str = data['timestamp']
                 app_usage = data['app_usage']
+                host = data.get('host')  # Messages produced before host tagging have none
                 
                 # Convert timestamp back to datetime
                 from datetime import datetime
                 timestamp = datetime.fromisoformat(timestamp_str)
                 
-                yield timestamp, app_usage
+                yield timestamp, app_usage, host
                 
             except Exception as e:
                 logging.error(f"Error processing Kafka message: {e}")
@@ -62,12 +69,90 @@ class KafkaNetworkConsumer:
     def close(self):
         self.consumer.close()
 
+class KafkaTopicRangeReader:
+    """Reads raw messages between two offsets of every partition, outside any consumer group"""
+    def __init__(self, bootstrap_servers, topic, max_poll_records=10000):
+        self.topic = topic
+        self.consumer = KafkaConsumer(
+            bootstrap_servers=bootstrap_servers,
+            enable_auto_commit=False,   # Backfill tracks its own checkpoints
+            auto_offset_reset='earliest',
+            max_poll_records=max_poll_records,
+            fetch_max_bytes=64 * 1024 * 1024,
+            max_partition_fetch_bytes=16 * 1024 * 1024,
+        )
+        partitions = self.consumer.partitions_for_topic(topic) or set()
+        self.partitions = [TopicPartition(topic, p) for p in sorted(partitions)]
+
+    def beginning_offsets(self):
+        return {tp.partition: offset for tp, offset in self.consumer.beginning_offsets(self.partitions).items()}
+
+    def end_offsets(self):
+        return {tp.partition: offset for tp, offset in self.consumer.end_offsets(self.partitions).items()}
+
+    def offsets_for_timestamp(self, timestamp_ms):
+        """First offset at or after timestamp_ms per partition, or the end offset if there is none"""
+        end_offsets = self.end_offsets()
+        found = self.consumer.offsets_for_times({tp: timestamp_ms for tp in self.partitions})
+        return {
+            tp.partition: found[tp].offset if found.get(tp) is not None else end_offsets[tp.partition]
+            for tp in self.partitions
+        }
+
+    def read_range(self, start_offsets, end_offsets, timeout_ms=1000):
+        """
+        Generator that yields batches of (partition, offset, raw value) until every
+        partition reaches its end offset (exclusive). Values are left undecoded.
+        Offsets are clamped to what the partitions actually hold.
+        """
+        beginning_offsets = self.beginning_offsets()
+        high_watermarks = self.end_offsets()
+        start_offsets = {p: max(start, beginning_offsets[p]) for p, start in start_offsets.items() if p in high_watermarks}
+        end_offsets = {p: min(end, high_watermarks[p]) for p, end in end_offsets.items() if p in high_watermarks}
+
+        remaining = {
+            TopicPartition(self.topic, p): end_offsets[p]
+            for p, start in start_offsets.items() if start < end_offsets.get(p, 0)
+        }
+        if not remaining:
+            return
+
+        self.consumer.assign(list(remaining))
+        for tp in remaining:
+            self.consumer.seek(tp, start_offsets[tp.partition])
+
+        while remaining:
+            polled = self.consumer.poll(timeout_ms=timeout_ms)
+            batch = []
+            for tp, records in polled.items():
+                end = remaining.get(tp)
+                if end is None:
+                    continue
+                for record in records:
+                    if record.offset >= end:
+                        break
+                    batch.append((tp.partition, record.offset, record.value))
+            if not polled:
+                # Nothing more to fetch: stop partitions already at their high watermark
+                high_watermarks = self.end_offsets()
+                for tp in list(remaining):
+                    remaining[tp] = min(remaining[tp], high_watermarks[tp.partition])
+            for tp, end in list(remaining.items()):
+                if self.consumer.position(tp) >= end:
+                    del remaining[tp]
+                    self.consumer.pause(tp)
+            if batch:
+                yield batch
+
+    def close(self):
+        self.consumer.close()
+
 # Factory functions 
-def create_kafka_producer():
+def create_kafka_producer(**producer_config):
     """Create configured Kafka producer for network data"""
     from config.config import KAFKA_BOOTSTRAP_SERVERS, KAFKA_TOPIC_NETWORK_DATA
     
-    return KafkaNetworkProducer(KAFKA_BOOTSTRAP_SERVERS, KAFKA_TOPIC_NETWORK_DATA)
+    return KafkaNetworkProducer(KAFKA_BOOTSTRAP_SERVERS, KAFKA_TOPIC_NETWORK_DATA, **producer_config)
 
 def create_kafka_consumer():
     """Create configured Kafka consumer for network data"""
@@ -75,6 +160,12 @@ def create_kafka_consumer():
     
     return KafkaNetworkConsumer(KAFKA_BOOTSTRAP_SERVERS, KAFKA_TOPIC_NETWORK_DATA, KAFKA_CONSUMER_GROUP)
 
+def create_kafka_range_reader():
+    """Create Kafka reader for replaying a range of the network data topic"""
+    from config.config import KAFKA_BOOTSTRAP_SERVERS, KAFKA_TOPIC_NETWORK_DATA
+
+    return KafkaTopicRangeReader(KAFKA_BOOTSTRAP_SERVERS, KAFKA_TOPIC_NETWORK_DATA)
+
 def create_topic_if_not_exists():
     """Create the network metrics topic if it doesn't exist"""
     from config.config import KAFKA_BOOTSTRAP_SERVERS, KAFKA_TOPIC_NETWORK_DATA
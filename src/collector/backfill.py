@@ -0,0 +1,325 @@
+"""
+Bulk historical backfill of InfluxDB from Kafka retention or archived files.
+
+Messages are decoded to line protocol in parallel worker processes and written in
+large batches, in source order, with a checkpoint saved after every write so an
+interrupted run can resume. The checkpoint records the source and requested range
+and is only resumed by the same command. Re-writing a point with the same series and timestamp
+overwrites it in InfluxDB, so replaying a batch after a crash is harmless.
+
+Backfilling days that are already compacted lowers the compaction watermark
+before writing, so they are read from raw data and rolled up again. Do not run
+the compaction job while a backfill is in progress.
+"""
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from functools import partial
+import gzip
+import json
+import logging
+import os
+
+from src.db.compaction import lower_watermark
+from src.db.influxdb_service import InfluxDBService, encode_network_traffic
+
+DEFAULT_CHECKPOINT = ".backfill_checkpoint.json"
+DEFAULT_BATCH_SIZE = 200000  # line protocol records per InfluxDB write
+DEFAULT_CHUNK_LINES = 20000  # records handed to a worker at a time
+
+MESSAGE_SUFFIXES = (".jsonl", ".jsonl.gz", ".json", ".json.gz")
+LINE_PROTOCOL_SUFFIXES = (".lp", ".lp.gz")
+
+# Nanoseconds per unit of each line protocol timestamp precision
+PRECISIONS = {"ns": 1, "us": 1_000, "ms": 1_000_000, "s": 1_000_000_000}
+
+
+class Checkpoint:
+    def __init__(self, path: str):
+        self.path = path
+        self.state = {"source": None, "completed": False, "kafka": {}, "files": {}}
+        if os.path.exists(path):
+            with open(path) as f:
+                self.state.update(json.load(f))
+
+    def start(self, source: dict):
+        """
+        Bind the checkpoint to one source and requested range. Positions saved by a
+        different backfill, or by one that already finished, would silently skip data,
+        so those raise instead of resuming.
+        """
+        saved_source = self.state["source"]
+        if saved_source is None and (self.state["kafka"] or self.state["files"]):
+            raise ValueError(f"Checkpoint {self.path} does not record which backfill it belongs to, "
+                             f"rerun with --reset to start over")
+        if saved_source is not None and saved_source != source:
+            raise ValueError(f"Checkpoint {self.path} belongs to another backfill ({saved_source}), "
+                             f"rerun with --reset or pass a different --checkpoint")
+        if self.state["completed"]:
+            raise ValueError(f"Checkpoint {self.path} records a finished backfill of {source}, "
+                             f"rerun with --reset to replay it again")
+        self.state["source"] = source
+
+    def update(self, section: str, positions: dict):
+        self.state[section].update(positions)
+
+    def save(self):
+        # Write then rename so a crash never leaves a half written checkpoint
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.state, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+def _timestamp_of(line: str) -> int:
+    return int(line.rsplit(" ", 1)[1])
+
+
+def _has_timestamp(line: str) -> bool:
+    parts = line.rsplit(" ", 1)
+    return len(parts) == 2 and parts[1].lstrip("-").isdigit()
+
+
+def decode_messages(values: list) -> tuple:
+    """
+    Worker: decode raw Kafka message values (JSON bytes or str) into line protocol records.
+    Returns (lines, skipped) where skipped counts malformed messages.
+    """
+    lines = []
+    skipped = 0
+    for value in values:
+        try:
+            data = json.loads(value)
+            timestamp = datetime.fromisoformat(data["timestamp"])
+            lines.extend(encode_network_traffic(timestamp, data["app_usage"] or {}, data.get("host")))
+        except Exception:
+            skipped += 1
+    return lines, skipped
+
+
+def decode_line_protocol(values: list, precision: str = "ns") -> tuple:
+    """
+    Worker: pass archived line protocol through, dropping blanks and comments.
+    Timestamps written in another precision are converted to nanoseconds, the
+    precision of every other line in a backfill, so batches sort and write as one.
+    Lines without a timestamp are skipped: the server would stamp them with the
+    current time, so they could be neither ordered nor replayed idempotently.
+    Returns (lines, skipped).
+    """
+    multiplier = PRECISIONS[precision]
+    lines = []
+    skipped = 0
+    for line in (value.strip() for value in values):
+        if not line or line.startswith("#"):
+            continue
+        if not _has_timestamp(line):
+            skipped += 1
+        elif multiplier == 1:
+            lines.append(line)
+        else:
+            head, timestamp = line.rsplit(" ", 1)
+            lines.append(f"{head} {int(timestamp) * multiplier}")
+    return lines, skipped
+
+
+def _open_archive(path: str):
+    return gzip.open(path, "rt") if path.endswith(".gz") else open(path)
+
+
+def kafka_chunks(reader, start_offsets: dict, end_offsets: dict):
+    """Yield (decoder, raw values, checkpoint positions) for a Kafka offset range"""
+    for batch in reader.read_range(start_offsets, end_offsets):
+        positions = {}
+        for partition, offset, _ in batch:
+            positions[str(partition)] = max(positions.get(str(partition), 0), offset + 1)
+        yield decode_messages, [value for _, _, value in batch], positions
+
+
+def file_chunks(directory: str, done: dict, chunk_lines: int = DEFAULT_CHUNK_LINES, precision: str = "ns"):
+    """
+    Yield (decoder, raw lines, checkpoint positions) for every archive file in a directory, in name order.
+    precision is the timestamp precision of the line protocol files (.jsonl messages carry ISO timestamps).
+    """
+    # Absolute paths so the checkpoint matches however the directory is spelled
+    directory = os.path.abspath(directory)
+    paths = sorted(
+        os.path.join(directory, name) for name in os.listdir(directory)
+        if name.endswith(MESSAGE_SUFFIXES + LINE_PROTOCOL_SUFFIXES)
+    )
+    for path in paths:
+        progress = done.get(path, {})
+        if progress.get("done"):
+            continue
+        decoder = partial(decode_line_protocol, precision=precision) if path.endswith(LINE_PROTOCOL_SUFFIXES) \
+            else decode_messages
+        skip = progress.get("lines", 0)
+        line_count = 0
+        chunk = []
+
+        with _open_archive(path) as f:
+            for line in f:
+                line_count += 1
+                if line_count <= skip:
+                    continue
+                chunk.append(line)
+                if len(chunk) >= chunk_lines:
+                    yield decoder, chunk, {path: {"lines": line_count}}
+                    chunk = []
+        yield decoder, chunk, {path: {"lines": line_count, "done": True}}
+
+
+def run_backfill(chunks, section: str, influxdb_service: InfluxDBService, checkpoint: Checkpoint,
+                 workers: int = None, batch_size: int = DEFAULT_BATCH_SIZE, rollup_service: InfluxDBService = None):
+    """
+    Decode chunks in a process pool and write them to InfluxDB in order.
+    At most 2 chunks per worker are in flight so memory stays bounded on large topics.
+    rollup_service is the database with the compaction watermark, None if compaction is not used.
+    """
+    workers = workers or os.cpu_count() or 1
+    pending = deque()
+    buffer = []
+    positions = {}
+    written = 0
+    skipped = 0
+
+    def flush():
+        nonlocal buffer, positions, written, skipped
+        if buffer:
+            # Time ordered batches keep InfluxDB writes append-mostly
+            buffer.sort(key=_timestamp_of)
+            oldest = datetime.fromtimestamp(_timestamp_of(buffer[0]) / 1e9, tz=timezone.utc).replace(tzinfo=None)
+            if rollup_service:
+                lower_watermark(rollup_service, oldest)
+            for i in range(0, len(buffer), batch_size):
+                influxdb_service.write_lines(buffer[i:i + batch_size])
+            written += len(buffer)
+        if positions:
+            checkpoint.update(section, positions)
+            checkpoint.save()
+        buffer, positions = [], {}
+        print(f"Backfilled {written:,} points, skipped {skipped:,} malformed records")
+
+    def collect_oldest():
+        nonlocal skipped
+        future, chunk_positions = pending.popleft()
+        lines, chunk_skipped = future.result()
+        buffer.extend(lines)
+        skipped += chunk_skipped
+        positions.update(chunk_positions)
+        if len(buffer) >= batch_size:
+            flush()
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for decoder, values, chunk_positions in chunks:
+            pending.append((pool.submit(decoder, values), chunk_positions))
+            if len(pending) >= workers * 2:
+                collect_oldest()
+        while pending:
+            collect_oldest()
+    flush()
+    checkpoint.state["completed"] = True
+    checkpoint.save()
+
+    if skipped:
+        logging.error(f"Backfill skipped {skipped:,} malformed records (bad JSON or line protocol without a timestamp)")
+    return written
+
+
+def backfill_from_kafka(influxdb_service, checkpoint, from_offset=None, to_offset=None,
+                        from_timestamp=None, to_timestamp=None, workers=None, batch_size=DEFAULT_BATCH_SIZE,
+                        rollup_service=None):
+    """
+    Replay a range of the network data topic. The range starts at the checkpoint if there is one,
+    otherwise at from_offset/from_timestamp (default: beginning of retention), and ends at
+    to_offset/to_timestamp (default: end of the topic when the backfill started).
+    """
+    from shared_utils.kafka_util import create_kafka_range_reader
+
+    reader = create_kafka_range_reader()
+    try:
+        checkpoint.start({
+            "type": "kafka",
+            "topic": reader.topic,
+            "from_offset": from_offset,
+            "to_offset": to_offset,
+            "from_timestamp": from_timestamp.isoformat() if from_timestamp else None,
+            "to_timestamp": to_timestamp.isoformat() if to_timestamp else None,
+        })
+        beginning_offsets = reader.beginning_offsets()
+        actual_end_offsets = reader.end_offsets()
+        if from_timestamp is not None:
+            start_offsets = reader.offsets_for_timestamp(int(from_timestamp.timestamp() * 1000))
+        elif from_offset is not None:
+            start_offsets = {p: max(from_offset, beginning) for p, beginning in beginning_offsets.items()}
+        else:
+            start_offsets = beginning_offsets
+        for partition, offset in checkpoint.state["kafka"].items():
+            if int(partition) in start_offsets:
+                start_offsets[int(partition)] = max(start_offsets[int(partition)], offset)
+
+        if to_timestamp is not None:
+            end_offsets = reader.offsets_for_timestamp(int(to_timestamp.timestamp() * 1000))
+        elif to_offset is not None:
+            # A partition may hold fewer messages than to_offset
+            end_offsets = {p: min(to_offset, end) for p, end in actual_end_offsets.items()}
+        else:
+            end_offsets = actual_end_offsets
+
+        print(f"Backfilling partitions {start_offsets} -> {end_offsets}")
+        return run_backfill(kafka_chunks(reader, start_offsets, end_offsets), "kafka",
+                            influxdb_service, checkpoint, workers, batch_size, rollup_service)
+    finally:
+        reader.close()
+
+
+def backfill_from_files(influxdb_service, checkpoint, directory, workers=None, batch_size=DEFAULT_BATCH_SIZE,
+                        precision="ns", rollup_service=None):
+    """
+    Replay a directory of archived Kafka messages (.jsonl) or line protocol files (.lp), optionally gzipped.
+    precision is the timestamp precision of the .lp files: ns, us, ms or s.
+    """
+    if precision not in PRECISIONS:
+        raise ValueError(f"precision must be one of {', '.join(PRECISIONS)}, got '{precision}'")
+    checkpoint.start({"type": "files", "directory": os.path.abspath(directory), "precision": precision})
+    print(f"Backfilling archives in {directory}")
+    return run_backfill(file_chunks(directory, checkpoint.state["files"], precision=precision), "files",
+                        influxdb_service, checkpoint, workers, batch_size, rollup_service)
+
+
+if __name__ == "__main__":
+    import argparse
+    from shared_utils.db_factory import create_influxdb_service, create_rollup_influxdb_service
+
+    parser = argparse.ArgumentParser(description="Rebuild InfluxDB from Kafka retention or archived files")
+    parser.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT, help=f"Resume file (default: {DEFAULT_CHECKPOINT})")
+    parser.add_argument("--reset", action="store_true", help="Ignore and overwrite an existing checkpoint")
+    parser.add_argument("--workers", type=int, help="Decoder processes (default: CPU count)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help=f"Points per InfluxDB write (default: {DEFAULT_BATCH_SIZE})")
+    sources = parser.add_subparsers(dest="source", required=True)
+
+    kafka_parser = sources.add_parser("kafka", help="Replay a range of the Kafka topic")
+    kafka_parser.add_argument("--from-offset", type=int, help="Start offset for every partition")
+    kafka_parser.add_argument("--to-offset", type=int, help="End offset (exclusive) for every partition")
+    kafka_parser.add_argument("--from-timestamp", type=datetime.fromisoformat, help="Start time, e.g. 2025-06-01T00:00")
+    kafka_parser.add_argument("--to-timestamp", type=datetime.fromisoformat, help="End time (exclusive)")
+
+    files_parser = sources.add_parser("files", help="Replay a directory of archived files")
+    files_parser.add_argument("directory", help="Directory with .jsonl/.lp files, optionally .gz")
+    files_parser.add_argument("--precision", choices=list(PRECISIONS), default="ns",
+                              help="Timestamp precision of the .lp files (default: ns)")
+
+    args = parser.parse_args()
+
+    if args.reset and os.path.exists(args.checkpoint):
+        os.remove(args.checkpoint)
+    checkpoint = Checkpoint(args.checkpoint)
+    influxdb_service = create_influxdb_service()
+    rollup_service = create_rollup_influxdb_service()
+
+    if args.source == "kafka":
+        backfill_from_kafka(influxdb_service, checkpoint, args.from_offset, args.to_offset,
+                            args.from_timestamp, args.to_timestamp, args.workers, args.batch_size, rollup_service)
+    else:
+        backfill_from_files(influxdb_service, checkpoint, args.directory, args.workers, args.batch_size,
+                            args.precision, rollup_service)
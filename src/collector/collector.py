@@ -7,11 +7,11 @@ def collector_thread_func(kafka_consumer: KafkaNetworkConsumer, influxdb_service
     buffer_limit = 2
 
     try:
-        for timestamp, app_net_usage in kafka_consumer.consume_network_data():
-            print(f"\n{timestamp.strftime('%H:%M:%S')}")
+        for timestamp, app_net_usage, host in kafka_consumer.consume_network_data():
+            print(f"\n{timestamp.strftime('%H:%M:%S')} {host}")
             print(app_net_usage)
             
-            batch_buffer.append((timestamp, app_net_usage))
+            batch_buffer.append((timestamp, app_net_usage, host))
             
             if len(batch_buffer) >= buffer_limit:
                 print(f"Storing batch of {len(batch_buffer)} records...")
@@ -0,0 +1,280 @@
+"""
+Tiered retention for network_traffic.
+
+Raw points older than a configurable age are rolled up into hourly and daily
+measurements, one day at a time. A day only counts as compacted once the in/out
+totals of both rollups match the raw data; the watermark (end of the last
+verified day) is then stored so DataProcessor and dashboards can read the coarse
+tiers for anything before it.
+
+InfluxDB 3 has no API to delete a time range of points and retention is set per
+database, so the two live apart: raw data in the main database, expired by its
+retention period (RAW_RETENTION_DAYS), and the rollups and watermark in the
+rollup database (ROLLUP_INFLUXDB_DATABASE), created without one so long history
+is kept. Only days still whole inside the raw retention period are compacted.
+
+Verification does not protect raw data from expiry: the retention period drops
+raw points whether or not their day was compacted. A day that fails verification
+is reported and the job exits non-zero, and it has to be fixed and compacted
+again before its raw points expire or that day is lost.
+
+The latest watermark written wins, so it can move back. A backfill of days before
+the watermark lowers it to the first backfilled day: readers go back to raw data
+for those days and the next run compacts them again.
+"""
+
+from datetime import datetime, timedelta, timezone
+import os
+import sys
+
+from config import config as default_config
+from src.db.influxdb_service import InfluxDBService, escape_tag, to_nanoseconds
+
+RAW_MEASUREMENT = "network_traffic"
+HOURLY_MEASUREMENT = "network_traffic_hourly"
+DAILY_MEASUREMENT = "network_traffic_daily"
+CHECKPOINT_MEASUREMENT = "network_traffic_compaction"
+
+# Tiers from finest to coarsest: (measurement, resolution of one point)
+TIERS = [
+    (RAW_MEASUREMENT, timedelta(0)),
+    (HOURLY_MEASUREMENT, timedelta(hours=1)),
+    (DAILY_MEASUREMENT, timedelta(days=1)),
+]
+
+
+def _sql_time(timestamp: datetime) -> str:
+    return f"TIMESTAMP '{timestamp.strftime('%Y-%m-%d %H:%M:%S')}'"
+
+
+def _start_of_day(timestamp: datetime) -> datetime:
+    return timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def raw_horizon(retention_days: int = None) -> datetime:
+    """Start (naive UTC) of the first day whose raw data is whole inside the raw retention period"""
+    retention_days = retention_days if retention_days is not None else int(
+        os.getenv("RAW_RETENTION_DAYS", default_config.RAW_RETENTION_DAYS)
+    )
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    return _start_of_day(now - timedelta(days=retention_days)) + timedelta(days=1)
+
+
+def _table_exists(influxdb_service: InfluxDBService, table_name: str) -> bool:
+    table = influxdb_service.client.query(
+        f"SELECT table_name FROM information_schema.tables WHERE table_name = '{table_name}'"
+    )
+    return table.num_rows > 0
+
+
+def load_watermark(rollup_service: InfluxDBService):
+    """
+    End (exclusive, naive UTC) of the last verified compacted day, or None before the first compaction.
+    Reads the rollup database, where the watermark is kept next to the tiers it describes.
+    """
+    # The checkpoint table does not exist until the first compaction
+    if not _table_exists(rollup_service, CHECKPOINT_MEASUREMENT):
+        return None
+    table = rollup_service.client.query(
+        f"SELECT compacted_until FROM {CHECKPOINT_MEASUREMENT} ORDER BY time DESC LIMIT 1"
+    )
+    if table.num_rows == 0:
+        return None
+    compacted_until = table.column("compacted_until")[0].as_py()
+    if compacted_until is None:
+        return None
+    return datetime.fromtimestamp(compacted_until / 1e9, tz=timezone.utc).replace(tzinfo=None)
+
+
+def save_watermark(rollup_service: InfluxDBService, compacted_until: datetime):
+    now_ns = to_nanoseconds(datetime.now(timezone.utc))
+    rollup_service.write_lines([f"{CHECKPOINT_MEASUREMENT} compacted_until={to_nanoseconds(compacted_until)}i {now_ns}"])
+
+
+def lower_watermark(rollup_service: InfluxDBService, timestamp: datetime) -> bool:
+    """
+    Move the watermark back to the day of timestamp if it is past it, e.g. before backfilling raw data there.
+    Never below the raw retention horizon: older raw points are dropped, those days stay on the rollups.
+    """
+    watermark = load_watermark(rollup_service)
+    day = max(_start_of_day(timestamp), raw_horizon())
+    if watermark is None or day >= watermark:
+        return False
+    save_watermark(rollup_service, day)
+    print(f"Lowered the compaction watermark from {watermark.strftime('%Y-%m-%d')} to {day.strftime('%Y-%m-%d')}, "
+          f"these days are compacted again on the next run")
+    return True
+
+
+def select_tiers(start: datetime, end: datetime, watermark, resolution: timedelta = timedelta(hours=1)) -> list:
+    """
+    Split [start, end) into (measurement, start, end) segments that read the coarsest
+    tier that still has the requested resolution. Before the watermark the rollups
+    cover the range, after it only raw data does.
+    """
+    if watermark is None or start >= watermark:
+        return [(RAW_MEASUREMENT, start, end)]
+
+    measurement = RAW_MEASUREMENT
+    for tier, tier_resolution in TIERS:
+        # A rollup bucket must not straddle the start of the range
+        aligned = tier_resolution == timedelta(0) or (start - datetime(1970, 1, 1)) % tier_resolution == timedelta(0)
+        if tier_resolution <= resolution and aligned:
+            measurement = tier
+
+    split = min(end, watermark)
+    segments = [(measurement, start, split)]
+    if end > split:
+        segments.append((RAW_MEASUREMENT, split, end))
+    return segments
+
+
+class Compactor:
+    def __init__(self, influxdb_service: InfluxDBService, rollup_service: InfluxDBService,
+                 raw_age_days: int = None, retention_days: int = None):
+        """
+        Args:
+            influxdb_service: main database with raw network_traffic
+            rollup_service: database for the hourly and daily tiers and the watermark
+            raw_age_days: compact raw data older than this
+            retention_days: retention period of the main database, raw data older than this is gone
+        """
+        self.influxdb = influxdb_service
+        self.rollup_influxdb = rollup_service
+        self.raw_age_days = raw_age_days if raw_age_days is not None else int(
+            os.getenv("COMPACTION_RAW_AGE_DAYS", default_config.COMPACTION_RAW_AGE_DAYS)
+        )
+        self.retention_days = retention_days if retention_days is not None else int(
+            os.getenv("RAW_RETENTION_DAYS", default_config.RAW_RETENTION_DAYS)
+        )
+        if self.raw_age_days >= self.retention_days - 1:
+            raise ValueError(f"Raw data must be compacted well before it expires: raw age {self.raw_age_days} days "
+                             f"with a retention period of {self.retention_days} days")
+        self.group_by_host = self._has_host_tag()
+
+    def _query(self, sql: str, influxdb_service: InfluxDBService = None):
+        return (influxdb_service or self.influxdb).client.query(sql).to_pandas()
+
+    def _has_host_tag(self) -> bool:
+        """Data written before host tagging has no host column at all"""
+        columns = self._query(
+            f"SELECT column_name FROM information_schema.columns WHERE table_name = '{RAW_MEASUREMENT}'"
+        )
+        return "host" in set(columns["column_name"])
+
+    def _oldest_raw_day(self):
+        df = self._query(f"SELECT MIN(time) AS oldest FROM {RAW_MEASUREMENT}")
+        if df.empty or df["oldest"].isna().all():
+            return None
+        return _start_of_day(df["oldest"].iloc[0].to_pydatetime().replace(tzinfo=None))
+
+    def _totals(self, influxdb_service: InfluxDBService, measurement: str, start: datetime, end: datetime):
+        df = self._query(f"""
+        SELECT SUM("in") AS total_in, SUM("out") AS total_out
+        FROM {measurement}
+        WHERE time >= {_sql_time(start)} AND time < {_sql_time(end)}
+        """, influxdb_service)
+        if df.empty:
+            return 0, 0
+        return int(df["total_in"].fillna(0).iloc[0]), int(df["total_out"].fillna(0).iloc[0])
+
+    def _encode(self, measurement: str, df) -> list:
+        lines = []
+        for row in df.itertuples(index=False):
+            host = getattr(row, "host", None) if self.group_by_host else None
+            host_tag = f",host={escape_tag(host)}" if isinstance(host, str) and host else ""
+            timestamp_ns = to_nanoseconds(row.time.to_pydatetime().replace(tzinfo=None))
+            lines.append(
+                f"{measurement}{host_tag},process_name={escape_tag(row.process_name)} "
+                f"in={int(row.total_in)}i,out={int(row.total_out)}i,samples={int(row.samples)}i {timestamp_ns}"
+            )
+        return lines
+
+    def compact_day(self, day: datetime) -> bool:
+        """Roll one day of raw data into both tiers and verify the totals. Safe to rerun."""
+        start, end = day, day + timedelta(days=1)
+        host_column = "host, " if self.group_by_host else ""
+
+        hourly = self._query(f"""
+        SELECT DATE_TRUNC('hour', time) AS time, {host_column}process_name,
+            SUM("in") AS total_in, SUM("out") AS total_out, COUNT(*) AS samples
+        FROM {RAW_MEASUREMENT}
+        WHERE time >= {_sql_time(start)} AND time < {_sql_time(end)}
+        GROUP BY 1, {host_column}process_name
+        """)
+        if hourly.empty:
+            return True
+
+        keys = ["host", "process_name"] if self.group_by_host else ["process_name"]
+        daily = hourly.assign(time=hourly["time"].dt.floor("D")) \
+            .groupby(["time"] + keys, dropna=False, as_index=False)[["total_in", "total_out", "samples"]].sum()
+
+        self.rollup_influxdb.write_lines(self._encode(HOURLY_MEASUREMENT, hourly) + self._encode(DAILY_MEASUREMENT, daily))
+
+        raw_totals = self._totals(self.influxdb, RAW_MEASUREMENT, start, end)
+        hourly_totals = self._totals(self.rollup_influxdb, HOURLY_MEASUREMENT, start, end)
+        daily_totals = self._totals(self.rollup_influxdb, DAILY_MEASUREMENT, start, end)
+        if not raw_totals == hourly_totals == daily_totals:
+            print(f"  ✗ {day.strftime('%Y-%m-%d')}: totals differ (raw {raw_totals}, "
+                  f"hourly {hourly_totals}, daily {daily_totals})")
+            return False
+
+        print(f"  ✓ {day.strftime('%Y-%m-%d')}: {len(hourly)} hourly and {len(daily)} daily points, "
+              f"totals in={raw_totals[0]:,} out={raw_totals[1]:,}")
+        return True
+
+    def run(self) -> bool:
+        """
+        Compact every whole day older than raw_age_days, resuming after the stored watermark.
+        Returns False when a day fails verification, its raw data is then at risk of expiry,
+        or when raw data expired before it was compacted.
+        """
+        cutoff = _start_of_day(datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=self.raw_age_days))
+        horizon = raw_horizon(self.retention_days)
+        watermark = load_watermark(self.rollup_influxdb)
+        ok = True
+        if watermark is not None and watermark < horizon:
+            print(f"ERROR: raw data from {watermark.strftime('%Y-%m-%d')} to {horizon.strftime('%Y-%m-%d')} expired "
+                  f"before it was compacted, those days are missing from the rollups.", file=sys.stderr)
+            ok = False
+
+        # A day partly past the retention period would roll up only what is left of it
+        day = watermark or self._oldest_raw_day()
+        day = max(day, horizon) if day is not None else None
+        if day is None or day >= cutoff:
+            print(f"Nothing to compact before {cutoff.strftime('%Y-%m-%d')}")
+            return ok
+
+        print(f"Compacting {day.strftime('%Y-%m-%d')} to {cutoff.strftime('%Y-%m-%d')} (raw data older than {self.raw_age_days} days)")
+        while day < cutoff:
+            if not self.compact_day(day):
+                print(f"ERROR: raw data for {day.strftime('%Y-%m-%d')} is at risk. It is not covered by verified "
+                      f"rollups but will still expire with the retention period. Fix the mismatch and rerun "
+                      f"before then. The watermark stays at the last verified day.", file=sys.stderr)
+                return False
+            day += timedelta(days=1)
+            save_watermark(self.rollup_influxdb, day)
+        return ok
+
+
+if __name__ == "__main__":
+    import argparse
+    from shared_utils.db_factory import create_influxdb_service, create_rollup_influxdb_service
+
+    parser = argparse.ArgumentParser(description="Roll old raw network_traffic into hourly and daily tiers")
+    parser.add_argument("--raw-age-days", type=int, help=f"Compact raw data older than this (default: {default_config.COMPACTION_RAW_AGE_DAYS})")
+    parser.add_argument("--tiers", nargs=2, metavar=("START", "END"), type=datetime.fromisoformat,
+                        help="Only print which tables to query for this range, e.g. for a dashboard")
+    parser.add_argument("--resolution-hours", type=float, default=1, help="Resolution needed with --tiers (default: 1)")
+    args = parser.parse_args()
+
+    influxdb_service = create_influxdb_service()
+    rollup_service = create_rollup_influxdb_service()
+    if args.tiers:
+        for measurement, start, end in select_tiers(*args.tiers, load_watermark(rollup_service),
+                                                    timedelta(hours=args.resolution_hours)):
+            database = "main" if measurement == RAW_MEASUREMENT else "rollup"
+            print(f"{measurement} ({database} database): {start} -> {end}")
+    else:
+        if not Compactor(influxdb_service, rollup_service, args.raw_age_days).run():
+            sys.exit(1)
@@ -1,6 +1,29 @@
+from datetime import datetime, timezone
 from influxdb_client_3 import InfluxDBClient3, Point
 
 
+def escape_tag(value: str) -> str:
+    """Escape a tag value for InfluxDB line protocol (commas, equals signs and spaces)."""
+    return value.replace("\\", "\\\\").replace(",", "\\,").replace("=", "\\=").replace(" ", "\\ ")
+
+
+def to_nanoseconds(timestamp: datetime) -> int:
+    """Epoch nanoseconds of a timestamp. Naive timestamps are treated as UTC, the same way Point.time() does."""
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return int(timestamp.timestamp()) * 1_000_000_000 + timestamp.microsecond * 1000
+
+
+def encode_network_traffic(timestamp: datetime, app_net_usage: dict, host: str = None) -> list:
+    """Line protocol equivalent of the Points built by InfluxDBService.write_batch for one record."""
+    timestamp_ns = to_nanoseconds(timestamp)
+    host_tag = f",host={escape_tag(host)}" if host else ""
+    return [
+        f"network_traffic{host_tag},process_name={escape_tag(process_name)} in={int(metrics['in'])}i,out={int(metrics['out'])}i {timestamp_ns}"
+        for process_name, metrics in app_net_usage.items()
+    ]
+
+
 class InfluxDBService:
     def __init__(self, config: dict):
         self.client = InfluxDBClient3(host=config["url"],
@@ -9,16 +32,20 @@ class InfluxDBService:
     
     def write_batch(self, batch_data: list):
         """
-        Converts a list of raw (timestamp, app_net_usage) tuples into InfluxDB Points
+        Converts a list of raw (timestamp, app_net_usage, host) tuples into InfluxDB Points
         and writes them to the configured bucket in a batch.
+        The host tag is left out when host is None (records from before host tagging).
         """
         if not batch_data:
             return
 
         points = []
-        for timestamp, app_net_usage in batch_data:
+        for timestamp, app_net_usage, host in batch_data:
             for process_name, metrics in app_net_usage.items():
-                point = Point("network_traffic") \
+                point = Point("network_traffic")
+                if host:
+                    point = point.tag("host", host)
+                point = point \
                     .tag("process_name", process_name) \
                     .field("in", metrics["in"]) \
                     .field("out", metrics["out"]) \
@@ -28,3 +55,12 @@ class InfluxDBService:
         if points:
             self.client.write(points)
 
+    def write_lines(self, lines: list):
+        """
+        Writes already encoded line protocol records in a single request.
+        Skips building Point objects, which matters for bulk loads of millions of points.
+        """
+        if not lines:
+            return
+
+        self.client.write(record="\n".join(lines))
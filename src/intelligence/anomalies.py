@@ -0,0 +1,54 @@
+"""
+Labelled anomalous days (24 hours x 5 apps, same app order as DataProcessor)
+used to check and tune the detector.
+"""
+
+import numpy as np
+
+ANOMALY_TYPES = ["movies_at_work", "work_at_night", "all_night_streaming"]
+
+
+def create_anomaly_matrix(anomaly_type="movies_at_work"):
+    """
+    Create a 24x5 matrix of hourly usage for an anomalous day
+
+    Args:
+        anomaly_type: "movies_at_work" or "work_at_night" or "all_night_streaming"
+    """
+    anomaly_matrix = np.zeros((24, 5))
+
+    if anomaly_type == "movies_at_work":
+        # Sleep hours (0-8): Normal minimal usage
+        for hour in range(9):
+            anomaly_matrix[hour] = [50000, 0, 0, 0, 0]  # Just Chrome background
+
+        # Work hours (9-17): HIGH entertainment usage (ANOMALY!)
+        for hour in range(9, 18):
+            anomaly_matrix[hour] = [12000000, 5000, 0, 2000000, 500000]  # Massive streaming + music during work
+
+        # Evening (18-23): Normal evening usage
+        for hour in range(18, 24):
+            anomaly_matrix[hour] = [8000000, 0, 0, 1500000, 800000]
+
+    elif anomaly_type == "work_at_night":
+        # Sleep hours (0-8): Normal
+        for hour in range(9):
+            anomaly_matrix[hour] = [50000, 0, 0, 0, 0]
+
+        # Work hours (9-17): Very light usage
+        for hour in range(9, 18):
+            anomaly_matrix[hour] = [500000, 20000, 0, 0, 0]
+
+        # Evening (18-23): WORK APPS ACTIVE (ANOMALY!)
+        for hour in range(18, 24):
+            anomaly_matrix[hour] = [3000000, 600000, 800000, 0, 0]  # Work apps at night
+
+    elif anomaly_type == "all_night_streaming":
+        # ALL HOURS: High streaming (ANOMALY!)
+        for hour in range(24):
+            anomaly_matrix[hour] = [15000000, 0, 0, 3000000, 1000000]  # 24/7 streaming
+
+    else:
+        raise ValueError(f"Unknown anomaly type: {anomaly_type}")
+
+    return anomaly_matrix
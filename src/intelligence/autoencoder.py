@@ -9,37 +9,40 @@ from tensorflow.keras.optimizers import Adam
 from datetime import datetime
 
 
+DEFAULT_HIDDEN_LAYERS = (60, 30, 10, 30, 60)
+DEFAULT_LEARNING_RATE = 0.001
+DEFAULT_EPOCHS = 100
+DEFAULT_BATCH_SIZE = 1
+DEFAULT_TOLERANCE = 1.5
+
+
 class Autoencoder:
-    def __init__(self):
+    def __init__(self, input_dim: int = 120, hidden_layers: tuple = DEFAULT_HIDDEN_LAYERS, learning_rate: float = DEFAULT_LEARNING_RATE):
         """
         Create a simple autoencoder for 24x5 daily matrices
         
-        Input: 120 features (24 hours × 5 apps)
-        Architecture: 120 → 60 → 30 → 10 → 30 → 60 → 120
+        Input: 120 features (24 hours × 5 apps), or input_dim for other app counts
+        Architecture: 120 → 60 → 30 → 10 → 30 → 60 → 120 by default,
+        hidden_layers sets the sizes between input and output (smallest is the bottleneck)
         """
-        self.model = Sequential([
-            # Encoder: Compress to smaller representation
-            Dense(60, activation='relu', input_shape=(120,)),
-            Dense(30, activation='relu'),
-            Dense(10, activation='relu'),  # Bottleneck - forces learning of patterns
-            
-            # Decoder: Reconstruct back to original size
-            Dense(30, activation='relu'),
-            Dense(60, activation='relu'),
-            Dense(120, activation='linear')  # Linear output for reconstruction
-        ])
-        self.model.compile(optimizer=Adam(learning_rate=0.001), loss='mse')
+        self.model = Sequential(
+            # Encoder compresses to the bottleneck, decoder reconstructs back to original size
+            [Dense(hidden_layers[0], activation='relu', input_shape=(input_dim,))]
+            + [Dense(units, activation='relu') for units in hidden_layers[1:]]
+            + [Dense(input_dim, activation='linear')]  # Linear output for reconstruction
+        )
+        self.model.compile(optimizer=Adam(learning_rate=learning_rate), loss='mse')
 
         self.threshold = None
 
-    def fit(self, X_train):
+    def fit(self, X_train, epochs: int = DEFAULT_EPOCHS, batch_size: int = DEFAULT_BATCH_SIZE, verbose: int = 1):
         print(f"Training autoencoder....")
         
         history = self.model.fit(
             X_train, X_train,  # Input = Output (reconstruction task)
-            epochs=100,
-            batch_size=1,      # Small batch since we have few days
-            verbose=1,
+            epochs=epochs,
+            batch_size=batch_size,  # Small batch since we have few days
+            verbose=verbose,
             shuffle=True
         )
         
@@ -55,7 +58,7 @@ class Autoencoder:
         
         return error
     
-    def set_threshold(self, training_matrices, tolerance: int = 1.5):
+    def set_threshold(self, training_matrices, tolerance: int = DEFAULT_TOLERANCE):
         training_errors = []
     
         for matrix in training_matrices:
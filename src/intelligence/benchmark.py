@@ -0,0 +1,111 @@
+"""
+Scaling benchmark for the intelligence pipeline.
+Runs the pipeline phases on synthetic hourly data while sweeping baseline length
+and app count, and prints how each phase grows, to see which one goes superlinear first.
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from src.intelligence.data_processor import DataProcessor, DEFAULT_APP_NAMES
+from src.intelligence.autoencoder import Autoencoder
+from src.intelligence.profiling import PhaseProfiler
+
+PHASES = ["materialize", "matrices", "scale", "fit", "threshold", "detect"]
+
+
+def synthetic_hourly_table(data_processor: DataProcessor, rng) -> pa.Table:
+    """Arrow table shaped like the result of DataProcessor.query_db: hour, process_name, total_usage"""
+    hours = pd.date_range(data_processor.start_date, data_processor.end_date, freq="h", inclusive="left")
+    apps = len(data_processor.app_names)
+
+    # Quiet nights, moderate work hours, heavy evenings, with per-app scale and noise
+    hour_of_day = hours.hour.to_numpy()
+    level = np.where(hour_of_day < 9, 0.01, np.where(hour_of_day < 18, 0.3, 1.0))
+    usage = level[:, None] * rng.uniform(1e6, 5e7, size=apps) * rng.uniform(0.5, 1.5, size=(len(hours), apps))
+
+    df = pd.DataFrame({
+        "hour": np.repeat(hours.to_numpy(), apps),
+        "process_name": np.tile(data_processor.app_names, len(hours)),
+        "total_usage": usage.ravel().astype(np.int64),
+    })
+    return pa.Table.from_pandas(df, preserve_index=False)
+
+
+def run_once(days: int, apps: int, epochs: int, rng) -> dict:
+    """Run every phase once and return wall seconds per phase"""
+    app_names = (DEFAULT_APP_NAMES + [f"proc-{i}" for i in range(apps)])[:apps]
+    data_processor = DataProcessor(None, days, app_names=app_names)
+    table = synthetic_hourly_table(data_processor, rng)
+    profiler = PhaseProfiler()
+
+    with profiler.phase("materialize"):
+        data = table.to_pandas()
+    with profiler.phase("matrices"):
+        matrices = data_processor.create_matrices(data)
+    with profiler.phase("scale"):
+        baseline_days_scaled, test_day_scaled, _ = data_processor.scale(matrices[:-1], matrices[-1:])
+
+    autoencoder = Autoencoder(input_dim=24 * apps)
+    with profiler.phase("fit"):
+        autoencoder.fit(baseline_days_scaled, epochs=epochs, verbose=0)
+    with profiler.phase("threshold"):
+        autoencoder.set_threshold(baseline_days_scaled)
+    with profiler.phase("detect"):
+        autoencoder.detect_anomaly(test_day_scaled)
+
+    return {record["phase"]: record["wall_s"] for record in profiler.phases}
+
+
+def growth_exponent(sizes: list, timings: list) -> float:
+    """Slope of a least squares fit of log(time) on log(size) over every sweep point (>1 is superlinear)"""
+    points = [(math.log(size), math.log(timing)) for size, timing in zip(sizes, timings) if size > 0 and timing > 0]
+    if len({x for x, _ in points}) < 2:
+        return float("nan")
+    x, y = np.array(points).T
+    return float(np.polyfit(x, y, 1)[0])
+
+
+def print_curve(label: str, sizes: list, results: list):
+    """Table of wall seconds per phase, plus the growth exponent fitted across all sizes (>1 is superlinear)"""
+    print(f"\n{'=' * 90}\nScaling with {label}\n{'=' * 90}")
+    print(f"{label:>8}" + "".join(f"{phase:>12}" for phase in PHASES) + f"{'total':>12}")
+    for size, timings in zip(sizes, results):
+        print(f"{size:>8}" + "".join(f"{timings[phase]:>12.3f}" for phase in PHASES) + f"{sum(timings.values()):>12.3f}")
+
+    if len(set(sizes)) > 1:
+        exponents = [growth_exponent(sizes, [timings[phase] for timings in results]) for phase in PHASES]
+        print(f"{'growth':>8}" + "".join(f"{exponent:>12.2f}" for exponent in exponents))
+        superlinear = [phase for phase, exponent in zip(PHASES, exponents) if exponent > 1.2]
+        print(f"Superlinear phases: {', '.join(superlinear) if superlinear else 'none'}")
+
+
+def main(days_sweep, apps_sweep, fixed_days, fixed_apps, epochs, seed):
+    rng = np.random.default_rng(seed)
+
+    # TensorFlow pays its one-time start-up cost on the first model, keep it out of the sweeps
+    print("Warm-up run (discarded)")
+    run_once(min(days_sweep), fixed_apps, epochs, rng)
+
+    days_results = [run_once(days, fixed_apps, epochs, rng) for days in days_sweep]
+    apps_results = [run_once(fixed_days, apps, epochs, rng) for apps in apps_sweep]
+
+    print_curve("days", days_sweep, days_results)
+    print_curve("apps", apps_sweep, apps_results)
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Benchmark pipeline phases on synthetic data")
+    parser.add_argument("--days", type=int, nargs="+", default=[7, 30, 90, 180, 365], help="Baseline lengths to sweep")
+    parser.add_argument("--apps", type=int, nargs="+", default=[5, 10, 20, 40], help="App counts to sweep")
+    parser.add_argument("--fixed-days", type=int, default=30, help="Baseline length used for the app sweep (default: 30)")
+    parser.add_argument("--fixed-apps", type=int, default=5, help="App count used for the days sweep (default: 5)")
+    parser.add_argument("--epochs", type=int, default=100, help="Training epochs, as in the pipeline (default: 100)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default: 0)")
+    args = parser.parse_args()
+
+    main(args.days, args.apps, args.fixed_days, args.fixed_apps, args.epochs, args.seed)
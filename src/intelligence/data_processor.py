@@ -4,18 +4,24 @@ from database and creating matrix of each day for the autoencoder model.
 """
 from datetime import datetime, timedelta
 from src.db.influxdb_service import InfluxDBService
+from src.db.compaction import RAW_MEASUREMENT, load_watermark, select_tiers
 import pandas as pd
 import numpy as np
+import pyarrow as pa
 
 DEFAULT_DAYS = 4
+DEFAULT_APP_NAMES = ['Google Chrome H', 'Slack', 'zoom.us', 'Music', 'Safari']
 
 class DataProcessor:
-    def __init__(self, influxdb: InfluxDBService = None, days: int = DEFAULT_DAYS):
+    def __init__(self, influxdb: InfluxDBService = None, days: int = DEFAULT_DAYS, host: str = None, app_names: list = None,
+                 rollup_influxdb: InfluxDBService = None):
         self.influxdb = influxdb
+        self.rollup_influxdb = rollup_influxdb  # Compacted tiers; None reads raw data only
         self.days = days
+        self.host = host  # None reads every host (and data written before host tagging)
 
         # Fixed top 5 apps (keep it simple)
-        self.app_names = ['Google Chrome H', 'Slack', 'zoom.us', 'Music', 'Safari']
+        self.app_names = app_names or DEFAULT_APP_NAMES
 
         # Get start of today, then go back N days
         # today_start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
@@ -23,25 +29,38 @@ class DataProcessor:
         self.end_date = today_start  # End at start of today (exclude today)
         self.start_date = self.end_date - timedelta(days=self.days)  # Go back N complete days
 
-    def get_data_from_db(self) ->  pd.DataFrame:                
+    def get_data_from_db(self) ->  pd.DataFrame:
+        return self.query_db().to_pandas()
+
+    def query_db(self):
+        """Run the hourly aggregation query and return the raw Arrow table (before to_pandas)"""
         print(f"Getting data from {self.start_date.strftime('%Y-%m-%d')} to {self.end_date.strftime('%Y-%m-%d')} (excluding today)")
+
+        # host is a tag, so filtering on it lets InfluxDB skip every other host's series.
+        # Rows written before host tagging have no host and still count as this host's history.
+        host_filter = ""
+        if self.host:
+            escaped_host = self.host.replace("'", "''")
+            host_filter = f"AND (host = '{escaped_host}' OR host IS NULL)"
         
-        # Query data
-        query = f"""
-        SELECT DATE_TRUNC('hour', time) AS hour,
-            process_name,
-            SUM("in") + SUM("out") AS total_usage
-        FROM network_traffic
-        WHERE time >= TIMESTAMP '{self.start_date.strftime('%Y-%m-%d %H:%M:%S')}'
-        AND time < TIMESTAMP '{self.end_date.strftime('%Y-%m-%d %H:%M:%S')}'
-        GROUP BY hour, process_name
-        ORDER BY hour ASC, process_name
-        """
-        
-        result = self.influxdb.client.query(query)
-        df = result.to_pandas()
+        # Compacted days are read from the hourly rollup, the rest from raw data.
+        # The tiers live in separate databases, so each segment is its own query.
+        watermark = load_watermark(self.rollup_influxdb) if self.rollup_influxdb else None
+        tables = []
+        for measurement, start, end in select_tiers(self.start_date, self.end_date, watermark):
+            influxdb = self.influxdb if measurement == RAW_MEASUREMENT else self.rollup_influxdb
+            tables.append(influxdb.client.query(f"""
+            SELECT DATE_TRUNC('hour', time) AS hour,
+                process_name,
+                SUM("in") + SUM("out") AS total_usage
+            FROM {measurement}
+            WHERE time >= TIMESTAMP '{start.strftime('%Y-%m-%d %H:%M:%S')}'
+            AND time < TIMESTAMP '{end.strftime('%Y-%m-%d %H:%M:%S')}'
+            {host_filter}
+            GROUP BY hour, process_name
+            """))
 
-        return df
+        return pa.concat_tables(tables).sort_by([("hour", "ascending"), ("process_name", "ascending")])
 
     def create_matrices(self, df: pd.DataFrame):
         daily_matrices = []
@@ -54,8 +73,8 @@ class DataProcessor:
             # Filter day data
             day_data = df[(df['hour'] >= start_of_day) & (df['hour'] < end_of_day)]
             
-            # Create 24x5 matrix
-            matrix = np.zeros((24, 5))
+            # Create 24 x apps matrix
+            matrix = np.zeros((24, len(self.app_names)))
             
             for _, row in day_data.iterrows():
                 hour = row['hour'].hour
@@ -3,40 +3,79 @@ This files runs the anomaly detection pipeline flow.
 It will call the data processor and then autoencoder model to check anomaly of the previous day.
 """
 
-from shared_utils.db_factory import create_influxdb_service
+from shared_utils.db_factory import create_influxdb_service, create_rollup_influxdb_service
+from shared_utils.host_util import get_host_id
 from src.intelligence.data_processor import DataProcessor
-from src.intelligence.autoencoder import Autoencoder
+from src.intelligence.autoencoder import (
+    Autoencoder, DEFAULT_HIDDEN_LAYERS, DEFAULT_LEARNING_RATE, DEFAULT_EPOCHS, DEFAULT_BATCH_SIZE, DEFAULT_TOLERANCE,
+)
+from src.intelligence.registry import ModelRegistry
+from src.intelligence.profiling import PhaseProfiler
 
 import numpy as np
 
-def main():
+def main(host=None, days=7, publish=False, profiler: PhaseProfiler = None):
+    host = host or get_host_id()
+    profiler = profiler or PhaseProfiler(enabled=False)
+
     # ==================== Preprocessing ====================
     # 1. Load data
-    data_processor = DataProcessor(create_influxdb_service(), 7)
-    data = data_processor.get_data_from_db()
-    matrices = data_processor.create_matrices(data)
+    data_processor = DataProcessor(create_influxdb_service(), days, host,
+                                   rollup_influxdb=create_rollup_influxdb_service())
+    with profiler.phase("query"):
+        table = data_processor.query_db()
+    with profiler.phase("materialize"):
+        data = table.to_pandas()
+    with profiler.phase("matrices"):
+        matrices = data_processor.create_matrices(data)
 
     # 2. Train-test split 
     baseline_days = matrices[:-1]
     test_day = matrices[-1:]
 
     # 3. Simple normalization (divide by max to keep 0-1 range)    
-    baseline_days_scaled, test_day_scaled, max_value = data_processor.scale(baseline_days, test_day)
+    with profiler.phase("scale"):
+        baseline_days_scaled, test_day_scaled, max_value = data_processor.scale(baseline_days, test_day)
 
     # ==================== Autoencoder model ===========================
-    # 1. create model
-    autoencoder = Autoencoder()
+    # 1. create model (with the host's tuned hyperparameters if tuning.py saved any)
+    registry = ModelRegistry()
+    tuned = registry.load_tuned_config(host) or {}
+    autoencoder = Autoencoder(hidden_layers=tuple(tuned.get("hidden_layers", DEFAULT_HIDDEN_LAYERS)),
+                              learning_rate=tuned.get("learning_rate", DEFAULT_LEARNING_RATE))
 
     # 2. train on baseline days
-    autoencoder.fit(baseline_days_scaled)
+    with profiler.phase("fit"):
+        autoencoder.fit(baseline_days_scaled, epochs=tuned.get("epochs", DEFAULT_EPOCHS),
+                        batch_size=tuned.get("batch_size", DEFAULT_BATCH_SIZE))
 
     # 3. set threshold
-    autoencoder.set_threshold(baseline_days_scaled)
+    with profiler.phase("threshold"):
+        autoencoder.set_threshold(baseline_days_scaled, tuned.get("tolerance", DEFAULT_TOLERANCE))
 
     # 4. check anomaly of test day
-    autoencoder.detect_anomaly(test_day_scaled)
+    with profiler.phase("detect"):
+        autoencoder.detect_anomaly(test_day_scaled)
+
+    profiler.report()
+
+    # 5. publish to the registry so the scoring service picks it up
+    if publish:
+        registry.publish(host, autoencoder.model, autoencoder.threshold, max_value,
+                                {"days": days, "app_names": data_processor.app_names})
 
 
     
 if __name__=="__main__":
-    main()
\ No newline at end of file
+    import argparse
+    parser = argparse.ArgumentParser(description="Train on the baseline days and check the latest day for anomalies")
+    parser.add_argument("--host", help="Host to analyse (default: this machine's host id)")
+    parser.add_argument("--days", type=int, default=7, help="Days to load, the last one is the test day (default: 7)")
+    parser.add_argument("--publish", action="store_true", help="Publish the trained model to the model registry")
+    parser.add_argument("--profile", action="store_true", help="Report wall time, CPU time and peak memory per phase")
+    parser.add_argument("--cprofile-dir", help="Dump cProfile stats per phase into this directory (implies --profile)")
+    parser.add_argument("--tracemalloc", action="store_true", help="Trace Python allocation peaks per phase (implies --profile)")
+    args = parser.parse_args()
+
+    profiler = PhaseProfiler(args.profile or bool(args.cprofile_dir) or args.tracemalloc, args.cprofile_dir, args.tracemalloc)
+    main(args.host, args.days, args.publish, profiler)
\ No newline at end of file
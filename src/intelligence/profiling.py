@@ -0,0 +1,126 @@
+"""
+Per-phase profiling for the intelligence pipeline.
+Records wall time, CPU time and peak resident memory of each phase, with
+optional cProfile and tracemalloc dumps per phase.
+
+Peak RSS is sampled on a background thread while the phase runs, so it includes
+native allocations (TensorFlow, NumPy) that tracemalloc does not see.
+"""
+
+from contextlib import contextmanager
+import cProfile
+import os
+import threading
+import time
+import tracemalloc
+
+import psutil
+
+RSS_SAMPLE_SECONDS = 0.01
+
+
+class PeakRSSSampler:
+    """Highest resident set size of this process seen between start() and stop()"""
+    def __init__(self, interval: float = RSS_SAMPLE_SECONDS):
+        self.interval = interval
+        self.process = psutil.Process()
+        self.peak = 0
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+
+    def _sample(self):
+        while not self._stopped.wait(self.interval):
+            self.peak = max(self.peak, self.process.memory_info().rss)
+
+    def start(self):
+        self.peak = self.process.memory_info().rss
+        self._thread.start()
+
+    def stop(self) -> int:
+        self._stopped.set()
+        self._thread.join()
+        self.peak = max(self.peak, self.process.memory_info().rss)
+        return self.peak
+
+
+class PhaseProfiler:
+    def __init__(self, enabled: bool = True, cprofile_dir: str = None, trace_memory: bool = False):
+        """
+        Args:
+            enabled: when False every phase is a no-op, so callers can always wrap their phases
+            cprofile_dir: write <phase>.prof (cProfile stats) per phase into this directory
+            trace_memory: track Python allocation peaks with tracemalloc and write <phase>.tracemalloc.txt
+                          (needs cprofile_dir or writes to the current directory)
+        """
+        self.enabled = enabled
+        self.cprofile_dir = cprofile_dir
+        self.trace_memory = trace_memory
+        self.phases = []
+
+        if self.enabled and self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        if self.enabled and self.cprofile_dir:
+            os.makedirs(self.cprofile_dir, exist_ok=True)
+
+    @contextmanager
+    def phase(self, name: str):
+        if not self.enabled:
+            yield
+            return
+
+        profiler = cProfile.Profile() if self.cprofile_dir else None
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        sampler = PeakRSSSampler()
+        sampler.start()
+        if profiler:
+            profiler.enable()
+        try:
+            yield
+        finally:
+            if profiler:
+                profiler.disable()
+            record = {
+                "phase": name,
+                "wall_s": time.perf_counter() - wall_start,
+                "cpu_s": time.process_time() - cpu_start,
+                "peak_rss_mb": sampler.stop() / 1024 / 1024,
+            }
+            if profiler:
+                profiler.dump_stats(os.path.join(self.cprofile_dir, f"{name}.prof"))
+            if self.trace_memory:
+                _, python_peak = tracemalloc.get_traced_memory()
+                record["python_peak_mb"] = python_peak / 1024 / 1024
+                self._dump_tracemalloc(name)
+            self.phases.append(record)
+
+    def _dump_tracemalloc(self, name: str, limit: int = 25):
+        snapshot = tracemalloc.take_snapshot()
+        path = os.path.join(self.cprofile_dir or ".", f"{name}.tracemalloc.txt")
+        with open(path, "w") as f:
+            for stat in snapshot.statistics("lineno")[:limit]:
+                f.write(f"{stat}\n")
+
+    def report(self):
+        if not self.enabled or not self.phases:
+            return
+
+        total_wall = sum(record["wall_s"] for record in self.phases)
+        header = f"{'phase':<12}{'wall s':>10}{'cpu s':>10}{'% wall':>8}{'peak RSS MB':>13}"
+        if self.trace_memory:
+            header += f"{'py peak MB':>12}"
+        print("\n" + "=" * len(header))
+        print(header)
+        print("=" * len(header))
+        for record in self.phases:
+            share = 100 * record["wall_s"] / total_wall if total_wall > 0 else 0
+            line = (f"{record['phase']:<12}{record['wall_s']:>10.3f}{record['cpu_s']:>10.3f}"
+                    f"{share:>7.1f}%{record['peak_rss_mb']:>13.1f}")
+            if self.trace_memory:
+                line += f"{record['python_peak_mb']:>12.1f}"
+            print(line)
+        print(f"{'total':<12}{total_wall:>10.3f}")
+        if self.cprofile_dir:
+            print(f"Profiles written to {self.cprofile_dir}/ (view with: python -m pstats <phase>.prof)")
@@ -0,0 +1,163 @@
+"""
+Versioned on-disk model registry.
+
+Layout:
+    <root>/<host>/<version>/model.json          threshold, max_value, activations
+    <root>/<host>/<version>/layer_<i>_kernel.npy
+    <root>/<host>/<version>/layer_<i>_bias.npy
+    <root>/<host>/CURRENT                       version currently served
+    <root>/<host>/tuned_config.json             best hyperparameters found by tuning.py
+
+Versions are never modified after publishing, so a reader holding memory-mapped
+weights of an old version is unaffected when a new one is published.
+"""
+
+from datetime import datetime
+import json
+import os
+import shutil
+
+import numpy as np
+
+from config import config as default_config
+
+
+class RegisteredModel:
+    def __init__(self, host: str, version: int, layers: list, threshold: float, max_value: float, metadata: dict):
+        self.host = host
+        self.version = version
+        self.layers = layers  # [(kernel, bias, activation), ...] with memory-mapped arrays
+        self.threshold = threshold
+        self.max_value = max_value
+        self.metadata = metadata
+
+    @property
+    def signature(self):
+        """Models with the same signature can be stacked into one batched forward pass"""
+        return tuple((kernel.shape, activation) for kernel, _, activation in self.layers)
+
+
+class ModelRegistry:
+    def __init__(self, root: str = None):
+        self.root = root or os.getenv("MODEL_REGISTRY_DIR", default_config.MODEL_REGISTRY_DIR)
+
+    def _host_dir(self, host: str) -> str:
+        if host in ("", ".", ".."):
+            raise ValueError(f"Invalid host '{host}'")  # Would resolve to the registry root or above it
+        return os.path.join(self.root, host.replace(os.sep, "_"))
+
+    def _pointer_path(self, host: str) -> str:
+        return os.path.join(self._host_dir(host), "CURRENT")
+
+    def hosts(self) -> list:
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(name for name in os.listdir(self.root) if os.path.exists(os.path.join(self.root, name, "CURRENT")))
+
+    def versions(self, host: str) -> list:
+        host_dir = self._host_dir(host)
+        if not os.path.isdir(host_dir):
+            return []
+        return sorted(int(name) for name in os.listdir(host_dir) if name.isdigit())
+
+    def current_version(self, host: str):
+        try:
+            with open(self._pointer_path(host)) as f:
+                return int(f.read().strip())
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def pointer_mtime(self, host: str):
+        """Cheap change check for hot reload: modification time of the CURRENT pointer"""
+        try:
+            return os.stat(self._pointer_path(host)).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def publish(self, host: str, model, threshold: float, max_value: float, metadata: dict = None) -> int:
+        """
+        Store a trained Keras model of Dense layers as a new version and make it current.
+
+        Args:
+            model: trained Keras model (e.g. Autoencoder.model)
+            threshold: anomaly threshold on scaled reconstruction error
+            max_value: scaling factor used on the training matrices
+        """
+        host_dir = self._host_dir(host)
+        os.makedirs(host_dir, exist_ok=True)
+        version = max(self.versions(host), default=0) + 1
+
+        # Build the version in a temp dir and rename, readers never see a partial version
+        tmp_dir = os.path.join(host_dir, f".tmp-{version}-{os.getpid()}")
+        os.makedirs(tmp_dir)
+        try:
+            activations = []
+            for i, layer in enumerate(model.layers):
+                kernel, bias = layer.get_weights()
+                np.save(os.path.join(tmp_dir, f"layer_{i}_kernel.npy"), kernel.astype(np.float32))
+                np.save(os.path.join(tmp_dir, f"layer_{i}_bias.npy"), bias.astype(np.float32))
+                activations.append(layer.activation.__name__)
+
+            with open(os.path.join(tmp_dir, "model.json"), "w") as f:
+                json.dump({
+                    "host": host,
+                    "version": version,
+                    "threshold": float(threshold),
+                    "max_value": float(max_value),
+                    "activations": activations,
+                    "created_at": datetime.now().isoformat(),
+                    **(metadata or {}),
+                }, f, indent=2)
+            os.rename(tmp_dir, os.path.join(host_dir, str(version)))
+        except Exception:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+
+        self.set_current(host, version)
+        print(f"Published model {host} v{version} to {host_dir}")
+        return version
+
+    def set_current(self, host: str, version: int):
+        """Point CURRENT at a version (also used to roll back)"""
+        pointer_path = self._pointer_path(host)
+        tmp_path = f"{pointer_path}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(str(version))
+        os.replace(tmp_path, pointer_path)
+
+    def save_tuned_config(self, host: str, tuned_config: dict):
+        host_dir = self._host_dir(host)
+        os.makedirs(host_dir, exist_ok=True)
+        path = os.path.join(host_dir, "tuned_config.json")
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(tuned_config, f, indent=2)
+        os.replace(tmp_path, path)
+
+    def load_tuned_config(self, host: str):
+        """Best config saved by tuning.py for this host, or None to use the defaults"""
+        try:
+            with open(os.path.join(self._host_dir(host), "tuned_config.json")) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def load(self, host: str, version: int = None) -> RegisteredModel:
+        """Load a version (default: current) with weights memory-mapped, not read into memory"""
+        version = version if version is not None else self.current_version(host)
+        if version is None:
+            raise KeyError(f"No model registered for host '{host}'")
+
+        version_dir = os.path.join(self._host_dir(host), str(version))
+        with open(os.path.join(version_dir, "model.json")) as f:
+            metadata = json.load(f)
+
+        layers = [
+            (
+                np.load(os.path.join(version_dir, f"layer_{i}_kernel.npy"), mmap_mode="r"),
+                np.load(os.path.join(version_dir, f"layer_{i}_bias.npy"), mmap_mode="r"),
+                activation,
+            )
+            for i, activation in enumerate(metadata["activations"])
+        ]
+        return RegisteredModel(host, version, layers, metadata["threshold"], metadata["max_value"], metadata)
@@ -0,0 +1,279 @@
+"""
+Long-running scoring service.
+
+Keeps registered models warm (memory-mapped weights, NumPy forward pass, no TensorFlow
+import) and serves reconstruction-error scoring over HTTP on TCP or a Unix socket.
+Concurrent requests from many hosts are combined into one batched forward pass.
+New model versions published to the registry are picked up without a restart.
+
+POST /score
+    {"host": "my-laptop", "matrices": [24x5 matrix, ...], "hours": 24}
+    `hours` < 24 scores partial days: only the first `hours` rows count in the error.
+GET /models
+GET /health
+"""
+
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from socketserver import ThreadingMixIn, UnixStreamServer
+import json
+import os
+import queue
+import threading
+import time
+
+import numpy as np
+
+from config import config as default_config
+from src.intelligence.registry import ModelRegistry
+
+ACTIVATIONS = {
+    "relu": lambda x: np.maximum(x, 0),
+    "linear": lambda x: x,
+    "sigmoid": lambda x: 1 / (1 + np.exp(-x)),
+    "tanh": np.tanh,
+}
+
+
+class ModelCache:
+    """Current model per host, reloaded when the registry's CURRENT pointer changes"""
+    def __init__(self, registry: ModelRegistry):
+        self.registry = registry
+        self.models = {}
+        self.pointer_mtimes = {}
+        self.lock = threading.Lock()
+
+    def get(self, host: str):
+        mtime = self.registry.pointer_mtime(host)
+        with self.lock:
+            if mtime is not None and self.pointer_mtimes.get(host) != mtime:
+                model = self.registry.load(host)
+                if host in self.models and self.models[host].version != model.version:
+                    print(f"Reloaded {host}: v{self.models[host].version} -> v{model.version}")
+                # Swap the reference; requests already holding the old model finish with it
+                self.models[host] = model
+                self.pointer_mtimes[host] = mtime
+            model = self.models.get(host)
+        if model is None:
+            raise KeyError(f"No model registered for host '{host}'")
+        return model
+
+
+def batched_forward(models: list, model_index: np.ndarray, inputs: np.ndarray) -> np.ndarray:
+    """
+    One forward pass for rows scored by different models of the same architecture.
+
+    Args:
+        models: distinct models sharing a signature
+        model_index: (rows,) index into models for every input row
+        inputs: (rows, features) scaled inputs
+    """
+    x = inputs.astype(np.float32)
+    for layer in range(len(models[0].layers)):
+        activation = models[0].layers[layer][2]
+        if len(models) == 1:
+            kernel, bias, _ = models[0].layers[layer]
+            x = x @ kernel + bias
+        else:
+            kernels = np.stack([model.layers[layer][0] for model in models])
+            biases = np.stack([model.layers[layer][1] for model in models])
+            x = np.einsum("bi,bio->bo", x, kernels[model_index]) + biases[model_index]
+        x = ACTIVATIONS[activation](x)
+    return x
+
+
+class MicroBatcher:
+    """Collects requests for up to max_wait_ms (or max_batch rows) and scores them together"""
+    def __init__(self, model_cache: ModelCache, max_batch: int = None, max_wait_ms: float = None):
+        self.model_cache = model_cache
+        self.max_batch = max_batch or default_config.SCORING_MAX_BATCH
+        self.max_wait = (max_wait_ms if max_wait_ms is not None else default_config.SCORING_MAX_WAIT_MS) / 1000
+        self.requests = queue.Queue()
+        self.thread = threading.Thread(target=self._run, name="ScoringBatcher", daemon=True)
+        self.thread.start()
+
+    def submit(self, host: str, matrices: np.ndarray, hours: int = 24) -> Future:
+        future = Future()
+        self.requests.put((host, matrices, hours, future))
+        return future
+
+    def _run(self):
+        while True:
+            batch = [self.requests.get()]
+            rows = len(batch[0][1])
+            deadline = time.monotonic() + self.max_wait
+            while rows < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    request = self.requests.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                batch.append(request)
+                rows += len(request[1])
+            self._score(batch)
+
+    def _score(self, batch):
+        # Resolve models first so an unknown host only fails its own request
+        resolved = []
+        for host, matrices, hours, future in batch:
+            try:
+                model = self.model_cache.get(host)
+                features = model.layers[0][0].shape[0]
+                if matrices[0].size != features:
+                    raise ValueError(f"Model for '{host}' expects {features} values per day, got {matrices[0].size}")
+                resolved.append((model, matrices, hours, future))
+            except Exception as e:
+                future.set_exception(e)
+
+        groups = {}
+        for request in resolved:
+            groups.setdefault(request[0].signature, []).append(request)
+
+        for requests in groups.values():
+            try:
+                self._score_group(requests)
+            except Exception as e:
+                for _, _, _, future in requests:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def _score_group(self, requests):
+        models, model_ids = [], {}
+        inputs, model_index, masks = [], [], []
+        for model, matrices, hours, _ in requests:
+            key = (model.host, model.version)
+            if key not in model_ids:
+                model_ids[key] = len(models)
+                models.append(model)
+            flat = matrices.reshape(len(matrices), -1)
+            inputs.append(flat / model.max_value if model.max_value > 0 else flat)
+            model_index.extend([model_ids[key]] * len(matrices))
+            # Partial days: only hours already observed contribute to the error
+            apps = matrices.shape[2]
+            mask = np.zeros(flat.shape[1], dtype=bool)
+            mask[:hours * apps] = True
+            masks.append(np.broadcast_to(mask, flat.shape))
+
+        inputs = np.concatenate(inputs)
+        masks = np.concatenate(masks)
+        reconstruction = batched_forward(models, np.asarray(model_index), inputs)
+        squared_error = np.where(masks, (inputs - reconstruction) ** 2, 0)
+        errors = squared_error.sum(axis=1) / masks.sum(axis=1)
+
+        start = 0
+        for model, matrices, hours, future in requests:
+            request_errors = errors[start:start + len(matrices)]
+            start += len(matrices)
+            future.set_result({
+                "host": model.host,
+                "version": model.version,
+                "threshold": model.threshold,
+                "errors": request_errors.tolist(),
+                "anomalies": (request_errors > model.threshold).tolist(),
+            })
+
+
+class ScoringRequestHandler(BaseHTTPRequestHandler):
+    batcher: MicroBatcher = None
+    registry: ModelRegistry = None
+    timeout_seconds = 30
+
+    def address_string(self):
+        # Unix socket clients have no (host, port) address
+        return self.client_address[0] if isinstance(self.client_address, tuple) else "unix"
+
+    def _send_json(self, status: int, body: dict):
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send_json(200, {"status": "ok"})
+        elif self.path == "/models":
+            self._send_json(200, {host: self.registry.current_version(host) for host in self.registry.hosts()})
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        if self.path != "/score":
+            self._send_json(404, {"error": "not found"})
+            return
+        try:
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            host = body.get("host")
+            if not isinstance(host, str) or not host:
+                raise ValueError("host is required")
+            if "matrices" not in body:
+                raise ValueError("matrices is required")
+            matrices = np.asarray(body["matrices"], dtype=np.float32)
+            if matrices.ndim == 2:
+                matrices = matrices[np.newaxis]  # a single day
+            hours = int(body.get("hours", 24))
+            if matrices.ndim != 3 or matrices.shape[1] != 24 or not 1 <= hours <= 24:
+                raise ValueError("matrices must be 24 x apps per day and hours between 1 and 24")
+        except Exception as e:
+            self._send_json(400, {"error": str(e)})
+            return
+
+        try:
+            future = self.batcher.submit(host, matrices, hours)
+            self._send_json(200, future.result(timeout=self.timeout_seconds))
+        except TimeoutError:
+            # The batcher is overloaded or stuck, not a problem with the request
+            self._send_json(503, {"error": f"scoring did not finish within {self.timeout_seconds}s"})
+        except KeyError as e:
+            self._send_json(404, {"error": e.args[0]})  # No model registered for this host
+        except Exception as e:
+            self._send_json(400, {"error": str(e)})
+
+    def log_message(self, format, *args):
+        pass  # One line per request is too noisy at fleet scale
+
+
+class ThreadingUnixHTTPServer(ThreadingMixIn, UnixStreamServer):
+    daemon_threads = True
+
+
+def serve(host: str = None, port: int = None, socket_path: str = None, registry_dir: str = None,
+          max_batch: int = None, max_wait_ms: float = None):
+    registry = ModelRegistry(registry_dir)
+    ScoringRequestHandler.registry = registry
+    ScoringRequestHandler.batcher = MicroBatcher(ModelCache(registry), max_batch, max_wait_ms)
+
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        server = ThreadingUnixHTTPServer(socket_path, ScoringRequestHandler)
+        print(f"Scoring service listening on unix:{socket_path} (registry: {registry.root})")
+    else:
+        host = host or default_config.SCORING_HOST
+        port = port or default_config.SCORING_PORT
+        server = ThreadingHTTPServer((host, port), ScoringRequestHandler)
+        print(f"Scoring service listening on http://{host}:{port} (registry: {registry.root})")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("Scoring service stopping...")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Serve anomaly scoring from the model registry")
+    parser.add_argument("--host", help=f"Bind address (default: {default_config.SCORING_HOST})")
+    parser.add_argument("--port", type=int, help=f"Port (default: {default_config.SCORING_PORT})")
+    parser.add_argument("--socket", help="Listen on this Unix socket path instead of TCP")
+    parser.add_argument("--registry", help=f"Model registry directory (default: {default_config.MODEL_REGISTRY_DIR})")
+    parser.add_argument("--max-batch", type=int, help=f"Max rows per forward pass (default: {default_config.SCORING_MAX_BATCH})")
+    parser.add_argument("--max-wait-ms", type=float, help=f"Max time to wait for a batch to fill (default: {default_config.SCORING_MAX_WAIT_MS})")
+    args = parser.parse_args()
+
+    serve(args.host, args.port, args.socket, args.registry, args.max_batch, args.max_wait_ms)
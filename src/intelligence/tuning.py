@@ -0,0 +1,172 @@
+"""
+Parallel hyperparameter and threshold search for the autoencoder.
+
+The baseline tensor is loaded from InfluxDB once and placed in shared memory.
+Worker processes attach to it without copying, train one candidate each and
+score every tolerance against held-out normal days and labelled anomaly days.
+The best config is saved per host in the model registry, where the pipeline picks it up.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from multiprocessing import get_context, shared_memory
+import itertools
+import os
+import random
+
+import numpy as np
+
+from src.intelligence.anomalies import ANOMALY_TYPES, create_anomaly_matrix
+from src.intelligence.autoencoder import Autoencoder, DEFAULT_HIDDEN_LAYERS
+
+SEARCH_SPACE = {
+    "hidden_layers": [DEFAULT_HIDDEN_LAYERS, (60, 20, 60), (90, 45, 15, 45, 90), (30, 10, 30), (64, 32, 8, 32, 64)],
+    "learning_rate": [0.001, 0.003, 0.0003],
+    "epochs": [50, 100, 200],
+    "batch_size": [1, 4],
+}
+TOLERANCES = [1.0, 1.25, 1.5, 2.0, 3.0]
+
+# Worker state, set once per process by _init_worker
+_shared = None
+_train = None
+_holdout = None
+_anomalies = None
+
+
+def _init_worker(shm_name, shape, dtype, train_days, anomalies):
+    global _shared, _train, _holdout, _anomalies
+    _shared = shared_memory.SharedMemory(name=shm_name)
+    days = np.ndarray(shape, dtype=dtype, buffer=_shared.buf)
+    _train, _holdout = days[:train_days], days[train_days:]
+    _anomalies = anomalies
+
+    # Parallelism comes from the pool, so each worker trains on a single thread
+    import tensorflow as tf
+    tf.config.threading.set_intra_op_parallelism_threads(1)
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+
+
+def reconstruction_errors(model, matrices):
+    """Per-row MSE of a batch, same error as Autoencoder.evaluate but in one predict call"""
+    reconstruction = model.predict(matrices, verbose=0)
+    return np.mean((matrices - reconstruction) ** 2, axis=1)
+
+
+def evaluate_candidate(candidate: dict, tolerances: list, seed: int) -> list:
+    """Train one candidate on the shared baseline and score it at every tolerance"""
+    import tensorflow as tf
+
+    tf.keras.utils.set_random_seed(seed)
+    autoencoder = Autoencoder(_train.shape[1], tuple(candidate["hidden_layers"]), candidate["learning_rate"])
+    # The shared memory views are passed as they are, copying them per candidate is what shared memory avoids
+    autoencoder.fit(_train, epochs=candidate["epochs"], batch_size=candidate["batch_size"], verbose=0)
+
+    train_errors = reconstruction_errors(autoencoder.model, _train)
+    holdout_errors = reconstruction_errors(autoencoder.model, _holdout) if len(_holdout) else np.array([])
+    anomaly_errors = reconstruction_errors(autoencoder.model, _anomalies)
+
+    results = []
+    for tolerance in tolerances:
+        threshold = train_errors.max() * tolerance
+        recall = float(np.mean(anomaly_errors > threshold))
+        specificity = float(np.mean(holdout_errors <= threshold)) if len(holdout_errors) else 1.0
+        # How far the weakest anomaly clears the threshold, used to break ties
+        margin = float(anomaly_errors.min() / threshold - 1) if threshold > 0 else 0.0
+        results.append({
+            **candidate,
+            "hidden_layers": list(candidate["hidden_layers"]),
+            "tolerance": tolerance,
+            "threshold": float(threshold),
+            "recall": recall,
+            "specificity": specificity,
+            "score": (recall + specificity) / 2,  # balanced accuracy
+            "margin": margin,
+        })
+    return results
+
+
+def candidates(search: str, samples: int, seed: int) -> list:
+    """Training settings to try. Tolerances are scored per trained model, so they are not in here"""
+    keys = list(SEARCH_SPACE)
+    grid = [dict(zip(keys, values)) for values in itertools.product(*(SEARCH_SPACE[key] for key in keys))]
+    if search == "random" and samples < len(grid):
+        return random.Random(seed).sample(grid, samples)
+    return grid
+
+
+def load_baseline(host: str, days: int):
+    """Baseline days for a host, scaled like the pipeline does, and the labelled anomalies on the same scale"""
+    from shared_utils.db_factory import create_influxdb_service, create_rollup_influxdb_service
+    from src.intelligence.data_processor import DataProcessor
+
+    data_processor = DataProcessor(create_influxdb_service(), days, host, rollup_influxdb=create_rollup_influxdb_service())
+    matrices = data_processor.create_matrices(data_processor.get_data_from_db())
+    anomalies = [create_anomaly_matrix(anomaly_type) for anomaly_type in ANOMALY_TYPES]
+    baseline_scaled, anomalies_scaled, max_value = data_processor.scale(matrices, anomalies)
+    return baseline_scaled.astype(np.float32), anomalies_scaled.astype(np.float32), max_value
+
+
+def tune(host: str = None, days: int = 30, holdout_days: int = None, search: str = "grid", samples: int = 40,
+         workers: int = None, seed: int = 0, save: bool = True):
+    from shared_utils.host_util import get_host_id
+    from src.intelligence.registry import ModelRegistry
+
+    host = host or get_host_id()
+    baseline, anomalies, max_value = load_baseline(host, days)
+    holdout_days = holdout_days if holdout_days is not None else max(1, len(baseline) // 5)
+    train_days = len(baseline) - holdout_days
+    if train_days < 2:
+        raise ValueError(f"Need at least 2 training days, got {len(baseline)} days with {holdout_days} held out")
+
+    # Workers map this block instead of receiving a pickled copy per task
+    shm = shared_memory.SharedMemory(create=True, size=baseline.nbytes)
+    try:
+        np.ndarray(baseline.shape, dtype=baseline.dtype, buffer=shm.buf)[:] = baseline
+        todo = candidates(search, samples, seed)
+        workers = workers or os.cpu_count() or 1
+        print(f"Tuning {host}: {len(todo)} candidates x {len(TOLERANCES)} tolerances on {workers} workers "
+              f"({train_days} training days, {holdout_days} held out, {len(anomalies)} anomaly days)")
+
+        results = []
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=get_context("spawn"),  # TensorFlow is not fork safe
+            initializer=_init_worker,
+            initargs=(shm.name, baseline.shape, baseline.dtype, train_days, anomalies),
+        ) as pool:
+            futures = [pool.submit(evaluate_candidate, candidate, TOLERANCES, seed) for candidate in todo]
+            for done, future in enumerate(futures, start=1):
+                results.extend(future.result())
+                print(f"  {done}/{len(todo)} candidates evaluated")
+    finally:
+        shm.close()
+        shm.unlink()
+
+    results.sort(key=lambda result: (result["score"], result["margin"]), reverse=True)
+    print(f"\n{'score':>6}{'recall':>8}{'spec':>6}{'tol':>6}{'lr':>8}{'epochs':>8}{'batch':>7}  hidden_layers")
+    for result in results[:10]:
+        print(f"{result['score']:>6.2f}{result['recall']:>8.2f}{result['specificity']:>6.2f}{result['tolerance']:>6}"
+              f"{result['learning_rate']:>8}{result['epochs']:>8}{result['batch_size']:>7}  {result['hidden_layers']}")
+
+    best = {**results[0], "host": host, "days": days, "max_value": float(max_value), "tuned_at": datetime.now().isoformat()}
+    if save:
+        ModelRegistry().save_tuned_config(host, best)
+        print(f"\nSaved best config for {host}")
+    return best
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Search autoencoder hyperparameters and tolerance in parallel")
+    parser.add_argument("--host", help="Host to tune (default: this machine's host id)")
+    parser.add_argument("--days", type=int, default=30, help="Baseline days to load (default: 30)")
+    parser.add_argument("--holdout-days", type=int, help="Latest normal days kept out of training (default: 20%%)")
+    parser.add_argument("--search", choices=["grid", "random"], default="grid", help="Full grid or random sample (default: grid)")
+    parser.add_argument("--samples", type=int, default=40, help="Candidates for random search (default: 40)")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default: 0)")
+    parser.add_argument("--dry-run", action="store_true", help="Print the best config without saving it")
+    args = parser.parse_args()
+
+    tune(args.host, args.days, args.holdout_days, args.search, args.samples, args.workers, args.seed, not args.dry_run)
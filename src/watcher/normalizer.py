@@ -0,0 +1,133 @@
+"""
+Process name normalization between parse_nettop_output and the rest of the pipeline.
+Keeps the number of process_name tag values (InfluxDB series) per host bounded.
+"""
+
+from functools import lru_cache
+import json
+import os
+import re
+
+from config import config as default_config
+
+# A newcomer replaces the weakest admitted process only if it beats its score by this
+# factor, so two processes of similar traffic do not keep swapping (each swap is a new series)
+EVICTION_MARGIN = 2
+
+
+class ProcessNameNormalizer:
+    def __init__(self, rules=None, cache_size=None, max_processes=None, min_bytes=None, other_name=None,
+                 half_life_intervals=None, state_path=None):
+        """
+        Args:
+            rules: ordered (regex, canonical name) pairs, first full match wins
+            cache_size: max raw names kept in the LRU cache of resolved names
+            max_processes: max processes without an explicit rule that have their own series at any time
+            min_bytes: traffic (in + out) in one interval a process without an explicit rule needs to be admitted
+            half_life_intervals: intervals for the traffic score of a quiet admitted process to halve
+            state_path: JSON file the admitted processes are kept in across restarts ("" to keep them in memory only)
+        """
+        rules = default_config.PROCESS_NAME_RULES if rules is None else rules
+        self.rules = [(re.compile(pattern), canonical) for pattern, canonical in rules]
+        self.max_processes = default_config.LONG_TAIL_MAX_PROCESSES if max_processes is None else max_processes
+        self.min_bytes = default_config.LONG_TAIL_MIN_BYTES if min_bytes is None else min_bytes
+        self.other_name = other_name or default_config.OTHER_PROCESS_NAME
+        half_life_intervals = default_config.LONG_TAIL_HALF_LIFE_INTERVALS if half_life_intervals is None \
+            else half_life_intervals
+        self.decay = 0.5 ** (1 / half_life_intervals)
+        self.state_path = default_config.LONG_TAIL_STATE_FILE if state_path is None else state_path
+
+        # App families named by a plain rule are never folded into "other"
+        self.known_apps = {canonical for _, canonical in rules if "\\" not in canonical}
+
+        # Long tail processes with their own series -> decayed bytes per interval.
+        # Never grows past max_processes, so neither does the number of active series.
+        self.admitted = self._load_state()
+
+        cache_size = default_config.PROCESS_NAME_CACHE_SIZE if cache_size is None else cache_size
+        self.canonical_name = lru_cache(maxsize=cache_size)(self._resolve)
+
+    def _load_state(self) -> dict:
+        if not self.state_path or not os.path.exists(self.state_path):
+            return {}
+        with open(self.state_path) as f:
+            saved = json.load(f)
+        # Rules or limits may have changed since the state was saved
+        saved = {name: score for name, score in saved.items() if name not in self.known_apps}
+        strongest = sorted(saved, key=saved.get, reverse=True)[:self.max_processes]
+        return {name: saved[name] for name in strongest}
+
+    def _save_state(self):
+        # Write then rename so a crash never leaves a half written file
+        tmp_path = f"{self.state_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.admitted, f, indent=2)
+        os.replace(tmp_path, self.state_path)
+
+    def _resolve(self, raw_name: str) -> str:
+        """Canonical app family of a raw nettop process name"""
+        for pattern, canonical in self.rules:
+            match = pattern.fullmatch(raw_name)
+            if match:
+                return match.expand(canonical).strip() or raw_name
+        return raw_name
+
+    def _admit(self, long_tail: list, volume: dict):
+        """
+        Update the decayed score of every admitted process, then admit the heaviest new
+        processes (at least min_bytes in this interval). When the set is full a newcomer
+        replaces the weakest admitted process if it beats its score by EVICTION_MARGIN,
+        so a process that went quiet gives its slot to one that is busy now.
+        """
+        for name in self.admitted:
+            self.admitted[name] = self.decay * self.admitted[name] + (1 - self.decay) * volume.get(name, 0)
+
+        candidates = sorted(
+            (name for name in long_tail if name not in self.admitted and volume[name] >= self.min_bytes),
+            key=lambda name: volume[name],
+            reverse=True,
+        )
+        for name in candidates:
+            if len(self.admitted) >= self.max_processes:
+                if not self.admitted:
+                    break
+                weakest = min(self.admitted, key=self.admitted.get)
+                if volume[name] <= EVICTION_MARGIN * self.admitted[weakest]:
+                    break  # Candidates are sorted, the rest cannot beat it either
+                del self.admitted[weakest]
+            self.admitted[name] = volume[name]
+
+    def normalize(self, app_net_usage: dict) -> dict:
+        """
+        Merge one interval's {process: {"in", "out"}} by canonical name and collapse the
+        long tail into a single `other` entry. Processes without an explicit rule keep
+        their own name only while they are in the admitted set (see _admit).
+        """
+        if not app_net_usage:
+            return app_net_usage
+
+        merged = {}
+        for raw_name, metrics in app_net_usage.items():
+            name = self.canonical_name(raw_name)
+            if name in merged:
+                merged[name]["in"] += metrics["in"]
+                merged[name]["out"] += metrics["out"]
+            else:
+                merged[name] = {"in": metrics["in"], "out": metrics["out"]}
+
+        volume = {name: metrics["in"] + metrics["out"] for name, metrics in merged.items()}
+        long_tail = [name for name in merged if name not in self.known_apps and name != self.other_name]
+        self._admit(long_tail, volume)
+        if self.state_path:
+            self._save_state()
+
+        collapsed = [name for name in long_tail if name not in self.admitted]
+
+        if collapsed:
+            other = merged.setdefault(self.other_name, {"in": 0, "out": 0})
+            for name in collapsed:
+                metrics = merged.pop(name)
+                other["in"] += metrics["in"]
+                other["out"] += metrics["out"]
+
+        return merged
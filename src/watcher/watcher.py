@@ -3,6 +3,8 @@ from datetime import datetime
 import re
 from config.config import NETTOP_DELAY
 from shared_utils.kafka_util import KafkaNetworkProducer
+from shared_utils.host_util import get_host_id
+from src.watcher.normalizer import ProcessNameNormalizer
 
 def run_nettop_command():
     result = subprocess.run(
@@ -54,15 +56,20 @@ def parse_nettop_output(nettop_output):
 
     return output    # json.dumps(output, indent=2)
 
-def watcher_thread_func(kafka_producer: KafkaNetworkProducer):
+def watcher_thread_func(kafka_producer: KafkaNetworkProducer, host: str = None):
+    host = host or get_host_id()
+    normalizer = ProcessNameNormalizer()
     try:
         while True:
             current_timestamp = datetime.now()
             nettop_output = run_nettop_command()
             result = parse_nettop_output(nettop_output)
+
+            # Map raw names to app families and fold the long tail into "other"
+            result = normalizer.normalize(result)
             
             # Send to Kafka instead of queue
-            success = kafka_producer.send_network_data(current_timestamp, result)
+            success = kafka_producer.send_network_data(current_timestamp, result, host)
             
             if success:
                 print(f"Sent data to Kafka: {current_timestamp.strftime('%H:%M:%S')}")
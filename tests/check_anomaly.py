@@ -3,9 +3,11 @@ This files runs the anomaly detection pipeline flow.
 It will call the data processor and then autoencoder model to check anomaly of the previous day.
 """
 
-from shared_utils.db_factory import create_influxdb_service
+from shared_utils.db_factory import create_influxdb_service, create_rollup_influxdb_service
+from shared_utils.host_util import get_host_id
 from src.intelligence.data_processor import DataProcessor
 from src.intelligence.autoencoder import Autoencoder
+from src.intelligence.anomalies import ANOMALY_TYPES, create_anomaly_matrix
 
 import numpy as np
 
@@ -16,53 +18,14 @@ def create_anomaly_test_data(anomaly_type="movies_at_work"):
     Args:
         anomaly_type: "movies_at_work" or "work_at_night" or "all_night_streaming"
     """
-    from datetime import datetime, timedelta
-    
-    # Use yesterday as our anomaly day
-    anomaly_date = datetime.now() - timedelta(days=1)
-    
     if anomaly_type == "movies_at_work":
         print("🎬 Creating 'Movies at Work' anomaly...")
-        # High Chrome streaming + Music during work hours (9-17)
-        anomaly_matrix = np.zeros((24, 5))
-        
-        # Sleep hours (0-8): Normal minimal usage
-        for hour in range(9):
-            anomaly_matrix[hour] = [50000, 0, 0, 0, 0]  # Just Chrome background
-        
-        # Work hours (9-17): HIGH entertainment usage (ANOMALY!)
-        for hour in range(9, 18):
-            anomaly_matrix[hour] = [12000000, 5000, 0, 2000000, 500000]  # Massive streaming + music during work
-        
-        # Evening (18-23): Normal evening usage
-        for hour in range(18, 24):
-            anomaly_matrix[hour] = [8000000, 0, 0, 1500000, 800000]
-    
     elif anomaly_type == "work_at_night":
         print("🌙 Creating 'Work at Night' anomaly...")
-        anomaly_matrix = np.zeros((24, 5))
-        
-        # Sleep hours (0-8): Normal
-        for hour in range(9):
-            anomaly_matrix[hour] = [50000, 0, 0, 0, 0]
-        
-        # Work hours (9-17): Very light usage
-        for hour in range(9, 18):
-            anomaly_matrix[hour] = [500000, 20000, 0, 0, 0]
-        
-        # Evening (18-23): WORK APPS ACTIVE (ANOMALY!)
-        for hour in range(18, 24):
-            anomaly_matrix[hour] = [3000000, 600000, 800000, 0, 0]  # Work apps at night
-    
     elif anomaly_type == "all_night_streaming":
         print("🌃 Creating 'All Night Streaming' anomaly...")
-        anomaly_matrix = np.zeros((24, 5))
-        
-        # ALL HOURS: High streaming (ANOMALY!)
-        for hour in range(24):
-            anomaly_matrix[hour] = [15000000, 0, 0, 3000000, 1000000]  # 24/7 streaming
     
-    return anomaly_matrix
+    return create_anomaly_matrix(anomaly_type)
 
 def calculate_reconstruction_error(autoencoder, matrix, max_value):
     """
@@ -121,9 +84,7 @@ def test_anomaly_detection(autoencoder, max_value, threshold):
     print("🧪 TESTING ANOMALY DETECTION")
     print("="*50)
     
-    anomaly_types = ["movies_at_work", "work_at_night", "all_night_streaming"]
-    
-    for anomaly_type in anomaly_types:
+    for anomaly_type in ANOMALY_TYPES:
         print(f"\n--- Testing {anomaly_type.replace('_', ' ').title()} ---")
         
         # Create anomaly matrix
@@ -145,7 +106,7 @@ def test_anomaly_detection(autoencoder, max_value, threshold):
 def main():
     # ==================== Preprocessing ====================
     # 1. Load data
-    data_processor = DataProcessor(create_influxdb_service(), 7)
+    data_processor = DataProcessor(create_influxdb_service(), 7, get_host_id(), rollup_influxdb=create_rollup_influxdb_service())
     data = data_processor.get_data_from_db()
     matrices = data_processor.create_matrices(data)
 
@@ -6,6 +6,7 @@ Creates N days of realistic network usage patterns
 
 from datetime import datetime, timedelta
 from shared_utils.db_factory import create_influxdb_service
+from shared_utils.host_util import get_host_id
 import numpy as np
 
 
@@ -54,15 +55,16 @@ def create_hourly_pattern(hour):
     
     return hour_data
 
-def generate_dummy_data(days=7):
+def generate_dummy_data(days=7, host=None):
     """Generate N days of dummy data"""
     
     influxdb_service = create_influxdb_service()
+    host = host or get_host_id()
     
     # Generate data starting from N days ago
     base_date = datetime.now() - timedelta(days=days)
     
-    print(f"🚀 Generating {days} days of dummy network data...")
+    print(f"🚀 Generating {days} days of dummy network data for host '{host}'...")
     
     for day in range(days):
         current_date = base_date + timedelta(days=day)
@@ -80,7 +82,7 @@ def generate_dummy_data(days=7):
                 app_net_usage = create_hourly_pattern(hour)
                 
                 if app_net_usage:  # Only add if there's some network activity
-                    day_batch.append((timestamp, app_net_usage))
+                    day_batch.append((timestamp, app_net_usage, host))
         
         # Insert day's data in batches
         batch_size = 50  # Match your collector buffer pattern
@@ -102,6 +104,7 @@ if __name__ == "__main__":
     import argparse
     parser = argparse.ArgumentParser(description="Generate dummy network data")
     parser.add_argument("--days", type=int, default=7, help="Number of days to generate (default: 7)")
+    parser.add_argument("--host", help="Host tag for the generated data (default: this machine's host id)")
     args = parser.parse_args()
     
-    generate_dummy_data(args.days)
\ No newline at end of file
+    generate_dummy_data(args.days, args.host)
\ No newline at end of file
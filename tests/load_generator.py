@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+High-volume synthetic load generator for scale testing.
+Generates months of network data for thousands of synthetic hosts with
+vectorized NumPy blocks and streams it to a line protocol file, Kafka or InfluxDB.
+"""
+
+from datetime import datetime, timedelta
+import gzip
+import time
+import numpy as np
+
+from src.db.influxdb_service import escape_tag, to_nanoseconds
+
+CORE_APPS = ['Google Chrome H', 'Slack', 'zoom.us', 'Music', 'Safari']
+
+# Anomalies injected into a host-day: affected hours and extra bytes per sample for each app
+ANOMALY_PROFILES = {
+    "movies_at_work": (range(9, 18), {'Google Chrome H': 1000000, 'Music': 160000, 'Safari': 40000}),
+    "work_at_night": (range(18, 24), {'Slack': 50000, 'zoom.us': 65000}),
+    "all_night_streaming": (range(0, 24), {'Google Chrome H': 1250000, 'Music': 250000, 'Safari': 80000}),
+}
+
+
+def build_profiles(processes, rng):
+    """
+    Build per hour (low, high) byte ranges and activity probabilities for every process.
+
+    The first 5 processes follow the same daily routine as dummy_baseline_data_generator.py,
+    the rest are a long tail of small background processes.
+
+    Returns:
+        app_names: list of process names
+        low, high: (24, processes) int64 arrays
+        p_active: (processes,) float array
+    """
+    app_names = CORE_APPS + [f"proc-{i}" for i in range(max(processes - len(CORE_APPS), 0))]
+    app_names = app_names[:max(processes, 1)]
+    low = np.zeros((24, len(app_names)), dtype=np.int64)
+    high = np.zeros((24, len(app_names)), dtype=np.int64)
+
+    core = {
+        # app: (sleep 0-8, work 9-17, evening 18-23)
+        'Google Chrome H': ((0, 20), (200000, 400000), (800000, 1500000)),
+        'Slack': ((0, 0), (30000, 80000), (0, 0)),
+        'zoom.us': ((0, 0), (0, 30000), (0, 0)),
+        'Music': ((0, 0), (0, 0), (100000, 300000)),
+        'Safari': ((0, 0), (0, 0), (50000, 200000)),
+    }
+    for index, app in enumerate(app_names[:len(CORE_APPS)]):
+        for hours, (lo, hi) in zip((range(0, 9), range(9, 18), range(18, 24)), core[app]):
+            low[hours, index] = lo
+            high[hours, index] = hi
+    if 'zoom.us' in app_names:
+        # Meeting hours
+        zoom = app_names.index('zoom.us')
+        low[[10, 14, 16], zoom] = 50000
+        high[[10, 14, 16], zoom] = 150000
+
+    tail = len(app_names) - len(CORE_APPS)
+    if tail > 0:
+        high[:, len(CORE_APPS):] = rng.integers(1000, 50000, size=tail)
+
+    p_active = np.full(len(app_names), 0.1)
+    p_active[:min(len(CORE_APPS), len(app_names))] = 0.7  # 70% chance app is active
+
+    return app_names, low, high, p_active
+
+
+def generate_block(rng, low, high, p_active, hosts, slots, interval_minutes, anomaly_rate, app_names):
+    """
+    Draw one day of samples for a block of hosts in a single vectorized pass.
+
+    Returns:
+        bytes_in, bytes_out: (hosts, slots, processes) int64 arrays, 0 where the process is idle
+        anomalies: list of (host offset in block, anomaly type)
+    """
+    hour_of_slot = (np.arange(slots) * interval_minutes) // 60
+    slot_low = low[hour_of_slot]
+    slot_high = high[hour_of_slot]
+    shape = (hosts, slots, low.shape[1])
+
+    active = (rng.random(shape) < p_active) & (slot_high > 0)
+    bytes_in = rng.integers(slot_low, slot_high + 1, size=shape)
+    bytes_out = (bytes_in * rng.uniform(0.2, 0.6, size=shape)).astype(np.int64)  # out < in generally
+
+    anomalies = []
+    anomalous_hosts = np.flatnonzero(rng.random(hosts) < anomaly_rate)
+    if anomalous_hosts.size:
+        anomaly_types = list(ANOMALY_PROFILES)
+        choices = rng.integers(0, len(anomaly_types), size=anomalous_hosts.size)
+        for host, choice in zip(anomalous_hosts.tolist(), choices.tolist()):
+            anomaly_type = anomaly_types[choice]
+            hours, boosts = ANOMALY_PROFILES[anomaly_type]
+            hour_slots = np.isin(hour_of_slot, list(hours))
+            for app, boost in boosts.items():
+                if app not in app_names:
+                    continue
+                index = app_names.index(app)
+                extra = rng.integers(boost // 2, boost + 1, size=int(hour_slots.sum()))
+                bytes_in[host, hour_slots, index] += extra
+                bytes_out[host, hour_slots, index] += extra // 4
+                active[host, hour_slots, index] = True
+            anomalies.append((host, anomaly_type))
+
+    bytes_in[~active] = 0
+    bytes_out[~active] = 0
+    return bytes_in, bytes_out, anomalies
+
+
+def encode_lines(bytes_in, bytes_out, prefixes, day_start_ns, interval_ns):
+    """Encode the non-idle samples of a block as line protocol, ordered by host, time and process."""
+    host_index, slot_index, app_index = np.nonzero(bytes_in | bytes_out)
+    processes = bytes_in.shape[2]
+    prefix_index = host_index * processes + app_index
+    timestamps = day_start_ns + slot_index.astype(np.int64) * interval_ns
+
+    return [
+        f"{prefixes[p]}in={i}i,out={o}i {t}"
+        for p, i, o, t in zip(
+            prefix_index.tolist(),
+            bytes_in[host_index, slot_index, app_index].tolist(),
+            bytes_out[host_index, slot_index, app_index].tolist(),
+            timestamps.tolist(),
+        )
+    ]
+
+
+def iter_messages(bytes_in, bytes_out, host_names, app_names, day_start, interval_minutes):
+    """Group a block into (host, timestamp, app_usage) messages in the watcher's Kafka format."""
+    for host in range(bytes_in.shape[0]):
+        for slot in np.flatnonzero((bytes_in[host] | bytes_out[host]).any(axis=1)).tolist():
+            timestamp = day_start + timedelta(minutes=slot * interval_minutes)
+            app_usage = {
+                app_names[app]: {"in": int(bytes_in[host, slot, app]), "out": int(bytes_out[host, slot, app])}
+                for app in np.flatnonzero(bytes_in[host, slot] | bytes_out[host, slot]).tolist()
+            }
+            yield host_names[host], timestamp, app_usage
+
+
+class LineProtocolFileSink:
+    def __init__(self, path):
+        self.file = gzip.open(path, "wt") if path.endswith(".gz") else open(path, "w")
+
+    def write(self, lines, block):
+        if lines:
+            self.file.write("\n".join(lines))
+            self.file.write("\n")
+
+    def close(self):
+        self.file.close()
+
+
+class InfluxDBSink:
+    def __init__(self, chunk_size):
+        from shared_utils.db_factory import create_influxdb_service
+        self.influxdb_service = create_influxdb_service()
+        self.chunk_size = chunk_size
+
+    def write(self, lines, block):
+        for i in range(0, len(lines), self.chunk_size):
+            self.influxdb_service.write_lines(lines[i:i + self.chunk_size])
+
+    def close(self):
+        pass
+
+
+class KafkaSink:
+    def __init__(self):
+        from shared_utils.kafka_util import create_kafka_producer
+        self.kafka_producer = create_kafka_producer(linger_ms=50, batch_size=1024 * 1024)
+
+    def write(self, lines, block):
+        for host, timestamp, app_usage in iter_messages(*block):
+            self.kafka_producer.send_network_data(timestamp, app_usage, host)
+        self.kafka_producer.flush()
+
+    def close(self):
+        self.kafka_producer.close()
+
+
+def generate_load(hosts=1000, days=30, processes=20, interval_minutes=1, anomaly_rate=0.01,
+                  sink="file", output="load.lp", host_chunk=64, chunk_size=100000,
+                  labels=None, seed=None):
+    """Generate `days` days of data for `hosts` synthetic hosts and stream it to the chosen sink"""
+    rng = np.random.default_rng(seed)
+    app_names, low, high, p_active = build_profiles(processes, rng)
+    host_names = [f"host-{i:05d}" for i in range(hosts)]
+    slots = (24 * 60) // interval_minutes
+    interval_ns = interval_minutes * 60 * 1_000_000_000
+
+    if sink == "file":
+        writer = LineProtocolFileSink(output)
+    elif sink == "influxdb":
+        writer = InfluxDBSink(chunk_size)
+    elif sink == "kafka":
+        writer = KafkaSink()
+    else:
+        raise ValueError(f"Unknown sink: {sink}")
+
+    base_date = (datetime.now() - timedelta(days=days)).replace(hour=0, minute=0, second=0, microsecond=0)
+    injected = []
+    total_points = 0
+    started = time.perf_counter()
+
+    print(f"🚀 Generating {days} days x {hosts} hosts x {len(app_names)} processes "
+          f"every {interval_minutes} min -> {sink}")
+    try:
+        for day in range(days):
+            day_start = base_date + timedelta(days=day)
+            day_start_ns = to_nanoseconds(day_start)
+            day_points = 0
+
+            for first in range(0, hosts, host_chunk):
+                block_hosts = host_names[first:first + host_chunk]
+                prefixes = [
+                    f"network_traffic,host={escape_tag(host)},process_name={escape_tag(app)} "
+                    for host in block_hosts for app in app_names
+                ]
+                bytes_in, bytes_out, anomalies = generate_block(
+                    rng, low, high, p_active, len(block_hosts), slots, interval_minutes, anomaly_rate, app_names
+                )
+                lines = encode_lines(bytes_in, bytes_out, prefixes, day_start_ns, interval_ns)
+                writer.write(lines, (bytes_in, bytes_out, block_hosts, app_names, day_start, interval_minutes))
+
+                day_points += len(lines)
+                injected.extend((block_hosts[host], day_start.date(), anomaly_type) for host, anomaly_type in anomalies)
+
+            total_points += day_points
+            elapsed = time.perf_counter() - started
+            print(f"📅 Day {day + 1}/{days}: {day_start.strftime('%Y-%m-%d')} - {day_points:,} points "
+                  f"({total_points / elapsed:,.0f} points/s overall)")
+    finally:
+        writer.close()
+
+    if labels:
+        with open(labels, "w") as f:
+            f.write("host,date,anomaly_type\n")
+            for host, date, anomaly_type in injected:
+                f.write(f"{host},{date.isoformat()},{anomaly_type}\n")
+
+    elapsed = time.perf_counter() - started
+    print(f"\n🎉 Generated {total_points:,} points in {elapsed:.1f}s ({total_points / elapsed:,.0f} points/s), "
+          f"{len(injected)} anomalous host-days injected")
+    return total_points
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Generate high-volume synthetic network data for load testing")
+    parser.add_argument("--hosts", type=int, default=1000, help="Number of synthetic hosts (default: 1000)")
+    parser.add_argument("--days", type=int, default=30, help="Number of days to generate (default: 30)")
+    parser.add_argument("--processes", type=int, default=20, help="Distinct process names per host (default: 20)")
+    parser.add_argument("--interval", type=int, default=1, help="Minutes between samples (default: 1)")
+    parser.add_argument("--anomaly-rate", type=float, default=0.01, help="Probability a host-day is anomalous (default: 0.01)")
+    parser.add_argument("--sink", choices=["file", "kafka", "influxdb"], default="file", help="Where to stream points (default: file)")
+    parser.add_argument("--output", default="load.lp", help="Line protocol file for the file sink, .gz to compress (default: load.lp)")
+    parser.add_argument("--host-chunk", type=int, default=64, help="Hosts generated per vectorized block (default: 64)")
+    parser.add_argument("--chunk-size", type=int, default=100000, help="Lines per InfluxDB write (default: 100000)")
+    parser.add_argument("--labels", help="Optional CSV file to record injected anomalies")
+    parser.add_argument("--seed", type=int, help="Random seed for reproducible runs")
+    args = parser.parse_args()
+
+    generate_load(args.hosts, args.days, args.processes, args.interval, args.anomaly_rate,
+                  args.sink, args.output, args.host_chunk, args.chunk_size, args.labels, args.seed)